@@ -1,3 +1,5 @@
+import os
+
 import pandas as pd
 
 
@@ -23,14 +25,232 @@ def read_csv(
     filename,
     dataset_class=dataset.pandas_dataset.PandasDataSet,
     expectations_config=None,
+    validation_only=False,
     *args, **kwargs
 ):
-    df = pd.read_csv(filename, *args, **kwargs)
+    """Read a csv file into a DataSet. Extra arguments are passed on to pandas.read_csv.
+
+    If validation_only is True, the file is read only to be validated against expectations_config: when every
+    expectation names the column it is about, only the columns the config references are parsed, and string columns
+    that the config only tests for nulls, types and set membership are read as categoricals. Hints that would change
+    how a value parses are dropped, so validation results are the same as with a full read.
+    """
+    if validation_only and expectations_config is not None and not hasattr(filename, "read") and \
+            os.path.isfile(filename):
+        df = _read_csv_for_validation(filename, expectations_config, *args, **kwargs)
+    else:
+        df = pd.read_csv(filename, *args, **kwargs)
     df.__class__ = dataset_class
     df.initialize_expectations(expectations_config)
 
     return df
 
+# Expectations that don't name a column and only need the number of rows
+_row_count_expectations = ["expect_table_row_count_to_be_between", "expect_table_row_count_to_equal"]
+
+# Expectations that give the same result on a categorical column of strings as on an object column of the same strings
+_categorical_expectations = [
+    "expect_column_to_exist",
+    "expect_column_values_to_be_null",
+    "expect_column_values_to_not_be_null",
+    "expect_column_values_to_be_of_type",
+    "expect_column_values_to_be_in_type_list",
+    "expect_column_values_to_be_in_set",
+    "expect_column_values_to_not_be_in_set",
+]
+
+# pandas.read_csv arguments that change how values parse, and so which column dtypes are safe to hint
+_parse_arguments = ["dtype", "converters", "parse_dates", "thousands", "decimal", "true_values", "false_values",
+                    "na_filter", "engine"]
+
+
+def _config_columns(expectations_config, columns):
+    """Return the columns, out of the columns of a file, that an expectations config references, in file order. Return
+    None if all the columns should be read: when an expectation may use columns it doesn't name, or when the config
+    references none of the columns."""
+    referenced = set()
+    for expectation in expectations_config["expectations"]:
+        if "column" in expectation["kwargs"]:
+            referenced.add(expectation["kwargs"]["column"])
+        elif expectation["expectation_type"] not in _row_count_expectations:
+            return None
+
+    columns = [column for column in columns if column in referenced]
+    if len(columns) == 0:
+        return None
+    return columns
+
+
+def _config_categorical_columns(expectations_config):
+    """Return the set of columns that an expectations config tests for membership in a set of strings, and otherwise
+    only with expectations that treat categoricals like strings."""
+    candidates = set()
+    excluded = set()
+    for expectation in expectations_config["expectations"]:
+        column = expectation["kwargs"].get("column")
+        if expectation["expectation_type"] not in _categorical_expectations:
+            excluded.add(column)
+        elif expectation["expectation_type"] == "expect_column_values_to_be_in_set":
+            value_set = expectation["kwargs"].get("value_set")
+            if isinstance(value_set, list) and pd.api.types.infer_dtype(value_set) in ["string", "unicode"]:
+                candidates.add(column)
+
+    return candidates - excluded
+
+
+def _categories_parse_as_strings(categories):
+    """True if pandas.read_csv would parse a column holding these tokens as strings. Otherwise, every token is a number
+    or a boolean and the column could have been read with a numeric or boolean dtype."""
+    categories = pd.Series(categories, dtype=object)
+    numeric = pd.to_numeric(categories, errors="coerce").notnull()
+    boolean = categories.str.lower().isin(["true", "false"])
+    return not (numeric | boolean).all()
+
+
+def _read_csv_for_validation(filename, expectations_config, *args, **kwargs):
+    header = pd.read_csv(filename, *args, **dict(kwargs, nrows=0)).columns
+    read_kwargs = dict(kwargs)
+
+    if "usecols" not in kwargs and "index_col" not in kwargs:
+        usecols = _config_columns(expectations_config, header)
+        if usecols is not None:
+            read_kwargs["usecols"] = usecols
+            header = usecols
+
+    categorical = []
+    if not any(argument in kwargs for argument in _parse_arguments) and "index_col" not in kwargs:
+        categorical = [column for column in header if column in _config_categorical_columns(expectations_config)]
+    if len(categorical) > 0:
+        read_kwargs["dtype"] = dict((column, "category") for column in categorical)
+    df = pd.read_csv(filename, *args, **read_kwargs)
+
+    # A column of numbers or booleans would not have been read as strings, so read just those columns again
+    numeric = [column for column in categorical if not _categories_parse_as_strings(df[column].cat.categories)]
+    if len(numeric) > 0:
+        numeric_df = pd.read_csv(filename, *args, **dict(kwargs, usecols=numeric))
+        for column in numeric:
+            df[column] = numeric_df[column].values
+
+    return df
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Reading Parquet and Feather files requires pyarrow. Install it with pip install pyarrow.")
+    return pyarrow
+
+
+def _open_arrow_source(pyarrow, filename, memory_map):
+    """Open a local file for pyarrow, as a memory map so that pyarrow reads it without copying it into its own buffers,
+    or as a plain file. Other sources are returned as they are. The caller closes what this opens."""
+    if hasattr(filename, "read") or not os.path.isfile(filename):
+        return filename
+    if memory_map:
+        return pyarrow.memory_map(filename, "r")
+    return pyarrow.OSFile(filename, "r")
+
+
+def _close_arrow_source(source, filename):
+    if source is not filename:
+        source.close()
+
+
+def read_parquet(
+    filename,
+    dataset_class=dataset.pandas_dataset.PandasDataSet,
+    expectations_config=None,
+    validation_only=False,
+    columns=None,
+    memory_map=True
+):
+    """Read a Parquet file into a DataSet with pyarrow.
+
+    Only the listed columns are read if columns is given. If validation_only is True and columns is not, only the
+    columns that expectations_config references are read, as in read_csv. Local files are memory mapped unless
+    memory_map is False.
+    """
+    pyarrow = _import_pyarrow()
+    import pyarrow.parquet
+
+    source = _open_arrow_source(pyarrow, filename, memory_map)
+    try:
+        parquet_file = pyarrow.parquet.ParquetFile(source)
+        if validation_only and columns is None and expectations_config is not None:
+            columns = _config_columns(expectations_config, parquet_file.schema.names)
+
+        df = parquet_file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+    finally:
+        _close_arrow_source(source, filename)
+    df.__class__ = dataset_class
+    df.initialize_expectations(expectations_config)
+
+    return df
+
+
+def read_feather(
+    filename,
+    dataset_class=dataset.pandas_dataset.PandasDataSet,
+    expectations_config=None,
+    validation_only=False,
+    columns=None,
+    memory_map=True
+):
+    """Read a Feather file into a DataSet with pyarrow.
+
+    columns, validation_only and memory_map are as in read_parquet. Uncompressed columns of a memory-mapped file are
+    not copied until they are converted to pandas.
+    """
+    pyarrow = _import_pyarrow()
+    import pyarrow.feather
+    import pyarrow.ipc
+
+    source = _open_arrow_source(pyarrow, filename, memory_map)
+    try:
+        if validation_only and columns is None and expectations_config is not None:
+            try:
+                # Version 2 Feather files are Arrow IPC files, whose schema can be read without reading the columns
+                names = pyarrow.ipc.open_file(source).schema.names
+            except pyarrow.ArrowInvalid:
+                names = []
+            columns = _config_columns(expectations_config, names)
+
+        df = pyarrow.feather.read_table(source, columns=columns).to_pandas()
+    finally:
+        _close_arrow_source(source, filename)
+    df.__class__ = dataset_class
+    df.initialize_expectations(expectations_config)
+
+    return df
+
+
+def validate_csv(
+    filename,
+    expectations_config,
+    chunksize=100000,
+    dataset_class=dataset.pandas_dataset.PandasDataSet,
+    catch_exceptions=True, output_format=None, include_config=None,
+    *args, **kwargs
+):
+    """Validate a csv file against an expectations config, reading it chunksize rows at a time.
+
+    Memory use is bounded by the chunk size rather than by the size of the file. The result has the same format as
+    DataSet.validate. Extra arguments are passed on to pandas.read_csv.
+    """
+    validator = dataset.StreamingValidator(
+        expectations_config,
+        dataset_class=dataset_class,
+        catch_exceptions=catch_exceptions,
+        output_format=output_format,
+        include_config=include_config
+    )
+
+    for chunk in pd.read_csv(filename, chunksize=chunksize, *args, **kwargs):
+        validator.update(chunk)
+
+    return validator.finalize()
+
 def df(df, dataset_config=None, *args, **kwargs):
     df.__class__ = dataset.pandas_dataset.PandasDataSet
     df.initialize_expectations(dataset_config)
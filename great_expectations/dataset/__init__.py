@@ -1,2 +1,3 @@
 from .base import DataSet
 from .pandas_dataset import MetaPandasDataSet, PandasDataSet
+from .streaming import StreamingValidator
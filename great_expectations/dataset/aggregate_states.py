@@ -0,0 +1,330 @@
+"""
+Mergeable states for column aggregate expectations.
+
+A state is built from the expectation's keyword arguments (init), fed the nonnull values of a column one or more
+chunks at a time (update), combined with a state built over other rows (merge) and finally reduced to the statistic
+the expectation tests (finalize). Because states merge, the same expectation can be evaluated in memory, chunk by chunk
+or over partitions in parallel.
+
+To use a state, decorate the implementing method with aggregate_state below the column_aggregate_expectation
+decorator. The method then receives the updated state in place of the column:
+
+    @MetaPandasDataSet.column_aggregate_expectation
+    @aggregate_state(ColumnMeanState)
+    def expect_column_mean_to_be_between(self, state, min_value, max_value):
+        column_mean = state.finalize()
+        ...
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from .sketches import HyperLogLog, KLLSketch
+from .util import is_valid_partition_object, remove_empty_intervals
+
+
+def aggregate_state(state_class):
+    """Declare the ColumnAggregateState subclass that a column aggregate expectation is computed from."""
+    def decorator(func):
+        func.aggregate_state = state_class
+        return func
+
+    return decorator
+
+
+class ColumnAggregateState(object):
+    """Base class for mergeable aggregate states.
+
+    Subclasses receive all the keyword arguments of the expectation in __init__ and should ignore the ones they don't
+    use.
+    """
+
+    def __init__(self, **kwargs):
+        self.count = 0
+
+    def update(self, values):
+        """Add a pandas Series of nonnull values to the state."""
+        self.count += len(values)
+        return self
+
+    def update_column(self, dataset, column, scan=None):
+        """Add the nonnull values of a column of a PandasDataSet to the state. States override this to use the column
+        statistics the data set shares between expectations. scan is the column's scan, if the caller already has it."""
+        if scan is None:
+            scan = dataset.get_column_scan(column)
+        return self.update(scan.nonnull_values)
+
+    def merge(self, other):
+        """Fold another state of the same class, built over different rows, into this one."""
+        self.count += other.count
+        return self
+
+    def finalize(self):
+        """Return the statistic described by the state."""
+        raise NotImplementedError
+
+
+class ColumnMeanState(ColumnAggregateState):
+
+    def __init__(self, **kwargs):
+        super(ColumnMeanState, self).__init__(**kwargs)
+        self.total = 0.
+
+    def update(self, values):
+        super(ColumnMeanState, self).update(values)
+        self.total += values.sum()
+        return self
+
+    def merge(self, other):
+        super(ColumnMeanState, self).merge(other)
+        self.total += other.total
+        return self
+
+    def finalize(self):
+        if self.count == 0:
+            return np.nan
+        return self.total / self.count
+
+
+class ColumnStdevState(ColumnAggregateState):
+    """Sample standard deviation. The state is (count, mean, sum of squared deviations), merged with the pairwise
+    update of Chan et al., which avoids the cancellation that a plain sum of squares suffers from."""
+
+    def __init__(self, **kwargs):
+        super(ColumnStdevState, self).__init__(**kwargs)
+        self.mean = 0.
+        self.m2 = 0.
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        if total == 0:
+            return
+
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, values):
+        if len(values) > 0:
+            values = values.astype(float)
+            mean = values.sum() / len(values)
+            self._combine(len(values), mean, ((values - mean) ** 2).sum())
+        return self
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def finalize(self):
+        if self.count < 2:
+            return np.nan
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class ColumnQuantileState(ColumnAggregateState):
+    """Quantiles of the values: exact from all the values, or estimated with a KLL sketch of size k if approximate is
+    True. finalize() returns the median; use quantile() for others."""
+
+    def __init__(self, approximate=False, k=200, **kwargs):
+        super(ColumnQuantileState, self).__init__(**kwargs)
+        if approximate:
+            # A fixed seed makes validation results reproducible
+            self.sketch = KLLSketch(k=k, random_state=0)
+        else:
+            self.sketch = None
+            self.values = []
+        # True while the state holds a single sorted array of numbers
+        self.is_sorted = False
+
+    def update(self, values):
+        super(ColumnQuantileState, self).update(values)
+        self.is_sorted = False
+        if self.sketch is None:
+            self.values.append(values.values)
+        else:
+            self.sketch.update(values)
+        return self
+
+    def update_column(self, dataset, column, scan=None):
+        if scan is None:
+            scan = dataset.get_column_scan(column)
+        # Sorting costs more than a selection-based median, so only use sorted values that are already cached
+        if self.sketch is not None or self.count > 0 or "sorted_values" not in scan:
+            return super(ColumnQuantileState, self).update_column(dataset, column, scan)
+
+        sorted_values = dataset.get_column_sorted_values(column, scan)
+        self.count += len(sorted_values)
+        self.values.append(sorted_values)
+        self.is_sorted = True
+        return self
+
+    def merge(self, other):
+        super(ColumnQuantileState, self).merge(other)
+        self.is_sorted = False
+        if self.sketch is None:
+            self.values.extend(other.values)
+        else:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _all_values(self):
+        if len(self.values) == 1:
+            return pd.Series(self.values[0])
+        return pd.Series(np.concatenate(self.values))
+
+    def quantile(self, q):
+        if self.sketch is not None:
+            return self.sketch.quantile(q)
+        if self.count == 0:
+            return np.nan
+        return self._all_values().quantile(q)
+
+    def finalize(self):
+        if self.sketch is not None:
+            return self.sketch.quantile(0.5)
+        if self.count == 0:
+            return np.nan
+        if self.is_sorted:
+            sorted_values = self.values[0]
+            middle = len(sorted_values) // 2
+            if len(sorted_values) % 2 == 1:
+                return float(sorted_values[middle])
+            return (float(sorted_values[middle - 1]) + float(sorted_values[middle])) / 2.
+        return self._all_values().median()
+
+
+class ColumnValueCountsState(ColumnAggregateState):
+    """Exact frequency table of the values."""
+
+    def __init__(self, **kwargs):
+        super(ColumnValueCountsState, self).__init__(**kwargs)
+        self.value_counts = None
+
+    def _add_counts(self, value_counts):
+        if self.value_counts is None:
+            self.value_counts = value_counts
+        else:
+            # Keep the ordering of Series.value_counts: most frequent first
+            self.value_counts = self.value_counts.add(value_counts, fill_value=0).sort_values(ascending=False)
+
+    def update(self, values):
+        super(ColumnValueCountsState, self).update(values)
+        self._add_counts(values.value_counts())
+        return self
+
+    def update_column(self, dataset, column, scan=None):
+        if scan is None:
+            scan = dataset.get_column_scan(column)
+        # The shared value counts are never modified: _add_counts replaces them with a new Series
+        self.count += len(scan.nonnull_values)
+        self._add_counts(dataset.get_column_value_counts(column, scan))
+        return self
+
+    def merge(self, other):
+        super(ColumnValueCountsState, self).merge(other)
+        if other.value_counts is not None:
+            self._add_counts(other.value_counts)
+        return self
+
+    def finalize(self):
+        if self.value_counts is None:
+            return pd.Series([], dtype=int)
+        return self.value_counts
+
+
+class ColumnDistinctCountState(ColumnValueCountsState):
+    """Number of distinct values: exact from the value counts, or estimated with a HyperLogLog sketch if approximate
+    is True."""
+
+    def __init__(self, approximate=False, relative_error=0.01, **kwargs):
+        super(ColumnDistinctCountState, self).__init__(**kwargs)
+        if approximate:
+            self.sketch = HyperLogLog(relative_error=relative_error)
+        else:
+            self.sketch = None
+
+    def update(self, values):
+        if self.sketch is None:
+            return super(ColumnDistinctCountState, self).update(values)
+
+        self.count += len(values)
+        self.sketch.update(values)
+        return self
+
+    def update_column(self, dataset, column, scan=None):
+        if self.sketch is None:
+            return super(ColumnDistinctCountState, self).update_column(dataset, column, scan)
+        return ColumnAggregateState.update_column(self, dataset, column, scan)
+
+    def merge(self, other):
+        if self.sketch is None:
+            return super(ColumnDistinctCountState, self).merge(other)
+
+        self.count += other.count
+        self.sketch.merge(other.sketch)
+        return self
+
+    def finalize(self):
+        if self.sketch is None:
+            return super(ColumnDistinctCountState, self).finalize().shape[0]
+        return self.sketch.estimate()
+
+
+class ColumnDistributionState(ColumnValueCountsState):
+    """Observed frequencies over a partition object: value counts for a discrete partition, a histogram over the fixed
+    bin edges of a continuous one. Empty intervals are removed from a continuous partition first. For a discrete
+    partition with an "other_weight", only the values in the partition are counted, and other_count is the number of
+    values that are not."""
+
+    def __init__(self, partition_object=None, **kwargs):
+        super(ColumnDistributionState, self).__init__(**kwargs)
+        self.partition_object = None
+        self.hist = None
+        self.categories = None
+
+        if is_valid_partition_object(partition_object):
+            if len(partition_object['weights']) != len(partition_object['partition']):
+                self.partition_object = remove_empty_intervals(copy.deepcopy(partition_object))
+                self.hist = np.zeros(len(self.partition_object['weights']))
+            elif "other_weight" in partition_object:
+                self.categories = pd.Index(partition_object['partition'], dtype=object)
+                self.hist = np.zeros(len(self.categories), dtype=np.int64)
+
+    @property
+    def other_count(self):
+        return self.count - int(self.hist.sum())
+
+    def update(self, values):
+        if self.hist is None:
+            return super(ColumnDistributionState, self).update(values)
+
+        self.count += len(values)
+        if self.categories is None:
+            self.hist += np.histogram(values, self.partition_object['partition'], density=False)[0]
+        else:
+            codes = self.categories.get_indexer(np.asarray(values, dtype=object))
+            self.hist += np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        return self
+
+    def update_column(self, dataset, column, scan=None):
+        if self.hist is None:
+            return super(ColumnDistributionState, self).update_column(dataset, column, scan)
+        return ColumnAggregateState.update_column(self, dataset, column, scan)
+
+    def merge(self, other):
+        if self.hist is None:
+            return super(ColumnDistributionState, self).merge(other)
+
+        self.count += other.count
+        self.hist += other.hist
+        return self
+
+    def finalize(self):
+        if self.hist is None:
+            return super(ColumnDistributionState, self).finalize()
+        if self.categories is not None:
+            return pd.Series(self.hist, index=self.categories)
+        return self.hist
@@ -3,12 +3,35 @@ import inspect
 import copy
 from functools import wraps
 import traceback
+import threading
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+from collections import OrderedDict
 
 import pandas as pd
 import numpy as np
 
 from .util import DotDict, ensure_json_serializable
 
+def _validate_column_subset(task):
+    """Validate one column group in a worker process; see DataSet.validate."""
+    dataset_class, subset, default_expectation_args, steps, catch_exceptions = task
+
+    subset.__class__ = dataset_class
+    subset.initialize_expectations()
+    subset.default_expectation_args = default_expectation_args
+
+    results = []
+    subset._column_scans = {}
+    for position, expectation in steps:
+        result = subset._run_validation_step(expectation, catch_exceptions)
+        # DotDicts don't pickle, so configs travel back as plain dicts
+        appended_config = dict(subset._get_expectation(subset._expectation_key(expectation)))
+        results.append((position, result, appended_config))
+
+    return results
+
+
 class DataSet(object):
 
     def __init__(self, *args, **kwargs):
@@ -158,6 +181,17 @@ class DataSet(object):
                     }
                 })
 
+        # The expectations in suite order, keyed by an insertion id, and an index from (expectation_type, column) to
+        # the ids of the expectations with that key. These are the source of truth for the suite; the "expectations"
+        # list in _expectations_config is rebuilt from them by get_expectations_config. A loaded config is kept
+        # exactly as given, duplicate keys included; append_expectation replaces all the expectations with its key.
+        self._expectations = OrderedDict()
+        self._expectation_index = {}
+        self._next_expectation_id = 0
+        self._expectation_index_lock = threading.Lock()
+        for expectation_config in self._expectations_config.expectations:
+            self._add_expectation(expectation_config)
+
         self.default_expectation_args = {
             "include_config" : False,
             "catch_exceptions" : False,
@@ -166,9 +200,45 @@ class DataSet(object):
 
         self._expectations_config.dataset_name = name
 
-    def append_expectation(self, expectation_config):
-        expectation_type = expectation_config['expectation_type']
+        # Per-column scans shared between expectations while validate() is running, or for as long as the data is
+        # unchanged if the column statistics cache is enabled
+        self._column_scans = None
+        self._cache_column_statistics = False
+        self._column_statistics_hits = 0
+        self._column_statistics_misses = 0
+
+    @staticmethod
+    def _expectation_key(expectation_config):
+        return (
+            expectation_config['expectation_type'],
+            expectation_config['kwargs'].get('column')
+        )
+
+    def _add_expectation(self, expectation_config):
+        key = self._expectation_key(expectation_config)
+
+        with self._expectation_index_lock:
+            self._expectations[self._next_expectation_id] = expectation_config
+            self._expectation_index.setdefault(key, []).append(self._next_expectation_id)
+            self._next_expectation_id += 1
+
+    def _upsert_expectation(self, expectation_config):
+        key = self._expectation_key(expectation_config)
+
+        # Removing before inserting moves a replaced expectation to the end, like appending to a list would.
+        with self._expectation_index_lock:
+            for expectation_id in self._expectation_index.pop(key, []):
+                del self._expectations[expectation_id]
+        self._add_expectation(expectation_config)
+
+    def _get_expectation(self, key):
+        """Return the last expectation in the suite with the key (expectation_type, column), or None."""
+        expectation_ids = self._expectation_index.get(key)
+        if not expectation_ids:
+            return None
+        return self._expectations[expectation_ids[-1]]
 
+    def append_expectation(self, expectation_config):
         #Drop existing expectations with the same expectation_type.
         #For column_expectations, append_expectation should only replace expectations
         # where the expectation_type AND the column match
@@ -176,20 +246,7 @@ class DataSet(object):
         #!!!    it needs to be documented, and
         #!!!    we need to provide syntax to override it.
 
-        if 'column' in expectation_config['kwargs']:
-            column  = expectation_config['kwargs']['column']
-
-            self._expectations_config.expectations = [f for f in filter(
-                lambda exp: (exp['expectation_type'] != expectation_type) | (exp['kwargs']['column'] != column),
-                self._expectations_config.expectations
-            )]
-        else:
-            self._expectations_config.expectations = [f for f in filter(
-                lambda exp: exp['expectation_type'] != expectation_type,
-                self._expectations_config.expectations
-            )]
-
-        self._expectations_config.expectations.append(expectation_config)
+        self._upsert_expectation(expectation_config)
 
     def get_default_expectation_arguments(self):
         return self.default_expectation_args
@@ -200,6 +257,7 @@ class DataSet(object):
         self.default_expectation_args[argument] = value
 
     def get_expectations_config(self):
+        self._expectations_config.expectations = list(self._expectations.values())
         return self._expectations_config
 
     def save_expectations_config(self, filepath=None):
@@ -210,31 +268,180 @@ class DataSet(object):
         expectation_config_str = json.dumps(self.get_expectations_config(), indent=2)
         open(filepath, 'w').write(expectation_config_str)
 
-    def validate(self, expectations_config=None, catch_exceptions=True, output_format=None, include_config=None):
-        results = []
+    def compile_validation_plan(self, expectations):
+        """Group a list of expectations by the column that each one touches.
+
+        Args:
+            expectations (list): expectation configs, e.g. expectations_config['expectations'].
+        Returns:
+            OrderedDict: maps each column (None for table-level expectations) to the ordered list of positions in
+            expectations that refer to it. Columns appear in order of first reference.
+        """
+        plan = OrderedDict()
+        for position, expectation in enumerate(expectations):
+            column = expectation['kwargs'].get('column')
+            plan.setdefault(column, []).append(position)
+
+        return plan
+
+    def validate(self, expectations_config=None, catch_exceptions=True, output_format=None, include_config=None,
+                 n_jobs=1, executor="thread"):
+        """Run every expectation in a config against this data set.
+
+        Args:
+            expectations_config (dict or None): the config to validate against; defaults to this data set's own config.
+            catch_exceptions (bool): passed to each expectation.
+            output_format (str or None): if not None, overrides the output_format of each expectation.
+            include_config (bool or None): if not None, overrides the include_config of each expectation.
+            n_jobs (int): the number of workers that evaluate expectations on different columns concurrently. 1 runs
+                everything in this thread; -1 uses one worker per CPU. 0 is an error.
+            executor (str): "thread" or "process". Threads share this data set and suit vectorized expectations;
+                processes each receive a copy of a single column and suit expectations that map python functions
+                over values (regex, dateutil, json...). The "process" executor requires the data set class to be
+                importable by the workers, i.e. defined at module level.
+
+        Returns:
+            dict: {"results": [...]}, one result per expectation in config order.
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must be a positive number of workers, or negative to use one worker per CPU.")
+        if executor not in ["thread", "process"]:
+            raise ValueError("Unknown executor %s: must be 'thread' or 'process'." % (executor,))
 
         if expectations_config is None:
             expectations_config = self.get_expectations_config()
 
-        for expectation in expectations_config['expectations']:
-            expectation_method = getattr(self, expectation['expectation_type'])
+        expectations = expectations_config['expectations']
+        for expectation in expectations:
             if output_format is not None:
                 expectation['kwargs'].update({"output_format": output_format})
             if include_config is not None:
                 expectation['kwargs'].update({"include_config": include_config})
-            result = expectation_method(
-                catch_exceptions=catch_exceptions,
-                **expectation['kwargs']
-            )
 
-            results.append(
-                dict(list(expectation.items()) + list(result.items()))
-            )
+        plan = self.compile_validation_plan(expectations)
+
+        if n_jobs < 0:
+            n_jobs = multiprocessing.cpu_count()
+
+        if n_jobs == 1:
+            results = self._validate_sequential(expectations, plan, catch_exceptions)
+        else:
+            results = self._validate_parallel(expectations, plan, catch_exceptions, n_jobs, executor)
 
         return {
             "results" : results
         }
 
+    # Scans made during validate() are released once they are no longer needed, unless the column statistics cache
+    # keeps them.
+    def _begin_column_scans(self):
+        if not self._cache_column_statistics:
+            self._column_scans = {}
+
+    def _release_column_scan(self, column):
+        if not self._cache_column_statistics:
+            self._column_scans.pop(column, None)
+
+    def _end_column_scans(self):
+        if not self._cache_column_statistics:
+            self._column_scans = None
+
+    def _validate_sequential(self, expectations, plan, catch_exceptions):
+        # Each column is scanned (null mask, nonnull values) at most once per validation: the scan is shared by every
+        # expectation on that column and released after the last expectation in the plan that refers to it.
+        last_use = dict(
+            (positions[-1], column) for column, positions in plan.items() if column is not None
+        )
+
+        results = []
+        self._begin_column_scans()
+        try:
+            for position, expectation in enumerate(expectations):
+                results.append(self._run_validation_step(expectation, catch_exceptions))
+
+                if position in last_use:
+                    self._release_column_scan(last_use[position])
+        finally:
+            self._end_column_scans()
+
+        return results
+
+    def _validate_parallel(self, expectations, plan, catch_exceptions, n_jobs, executor):
+        results = [None] * len(expectations)
+        appended_configs = [None] * len(expectations)
+
+        # Table-level expectations are cheap; run them here.
+        for position in plan.get(None, []):
+            results[position] = self._run_validation_step(expectations[position], catch_exceptions)
+
+        column_groups = [(column, positions) for column, positions in plan.items() if column is not None]
+
+        if executor == "thread":
+            def run_group(group):
+                column, positions = group
+                try:
+                    return [
+                        (position, self._run_validation_step(expectations[position], catch_exceptions), None)
+                        for position in positions
+                    ]
+                finally:
+                    self._release_column_scan(column)
+
+            self._begin_column_scans()
+            pool = ThreadPool(n_jobs)
+            try:
+                group_results = pool.map(run_group, column_groups)
+            finally:
+                pool.close()
+                pool.join()
+                self._end_column_scans()
+
+        else:
+            tasks = (
+                (
+                    self.__class__, self._column_subset(column), dict(self.default_expectation_args),
+                    [(position, dict(expectations[position])) for position in positions],
+                    catch_exceptions
+                )
+                for column, positions in column_groups
+            )
+
+            pool = multiprocessing.Pool(n_jobs)
+            try:
+                group_results = pool.map(_validate_column_subset, tasks)
+            finally:
+                pool.close()
+                pool.join()
+
+        for group_result in group_results:
+            for position, result, appended_config in group_result:
+                results[position] = result
+                if appended_config is not None:
+                    appended_configs[position] = DotDict(appended_config)
+
+        # Workers append expectations as they finish. Re-append them in config order so the config ends up exactly as
+        # it would after a sequential run.
+        for position, expectation in enumerate(expectations):
+            if appended_configs[position] is None:
+                appended_configs[position] = self._get_expectation(self._expectation_key(expectation))
+            if appended_configs[position] is not None:
+                self._upsert_expectation(appended_configs[position])
+
+        return results
+
+    def _run_validation_step(self, expectation, catch_exceptions):
+        expectation_method = getattr(self, expectation['expectation_type'])
+        result = expectation_method(
+            catch_exceptions=catch_exceptions,
+            **expectation['kwargs']
+        )
+
+        return dict(list(expectation.items()) + list(result.items()))
+
+    def _column_subset(self, column):
+        """Return a copy of this data set restricted to one column, to be shipped to a worker process."""
+        raise NotImplementedError
+
 
     ##### Output generation #####
     def format_column_map_output(self,
@@ -242,13 +449,17 @@ class DataSet(object):
         element_count,
         nonnull_values, nonnull_count,
         boolean_mapped_success_values, success_count,
-        exception_list, exception_index_list
+        exception_list, exception_index_list,
+        exception_count=None
     ):
+        # exception_count can be passed explicitly when exception_list only holds a sample of the exceptions
+        if exception_count is None:
+            exception_count = len(exception_list)
+
         if output_format == "BOOLEAN_ONLY":
             return_obj = success
 
         elif output_format == "BASIC":
-            exception_count = len(exception_list)
 
             if nonnull_count > 0:
                 exception_percent = float(exception_count) / element_count
@@ -276,9 +487,7 @@ class DataSet(object):
             }
 
         elif output_format == "SUMMARY":
-            # element_count = int(len(series))
-            missing_count = element_count-int(len(nonnull_values))#int(null_indexes.sum())
-            exception_count = len(exception_list)
+            missing_count = element_count - int(nonnull_count)
 
             exception_value_series = pd.Series(exception_list).value_counts()
             exception_counts = dict(zip(
@@ -286,6 +495,10 @@ class DataSet(object):
                 list(exception_value_series.values),
             ))
 
+            missing_percent = None
+            exception_percent = None
+            exception_percent_nonmissing = None
+
             if element_count > 0:
                 missing_percent = float(missing_count) / element_count
 
@@ -293,12 +506,6 @@ class DataSet(object):
                     exception_percent = float(exception_count) / element_count
                     exception_percent_nonmissing = float(exception_count) / nonnull_count
 
-            else:
-                missing_percent = None
-                nonmissing_count = None
-                exception_percent = None
-                exception_percent_nonmissing = None
-
             return_obj = {
                 "success": success,
                 "exception_list": exception_list,
@@ -323,6 +530,44 @@ class DataSet(object):
 
         return return_obj
 
+    def format_column_aggregate_output(self, output_format, result_obj, nonnull_count, null_count):
+        if output_format in ["BASIC", "COMPLETE"]:
+            return_obj = {
+                "success" : bool(result_obj["success"]),
+                "true_value" : result_obj["true_value"],
+            }
+
+        elif (output_format == "SUMMARY"):
+            if "summary_obj" in result_obj and result_obj["summary_obj"] is not None:
+                result_obj["summary_obj"].update({
+                    "element_count": nonnull_count,
+                    "missing_count": null_count,
+                    "missing_percent": nonnull_count / null_count if null_count > 0 else 0
+                })
+            else:
+                result_obj["summary_obj"] = {
+                    "element_count": nonnull_count,
+                    "missing_count": null_count,
+                    "missing_percent": nonnull_count / null_count if null_count > 0 else 0
+                }
+            return_obj = {
+                "success" : bool(result_obj["success"]),
+                "true_value" : result_obj["true_value"],
+                "summary_obj" : result_obj["summary_obj"]
+            }
+
+        elif output_format=="BOOLEAN_ONLY":
+            return_obj = bool(result_obj["success"])
+
+        else:
+            print ("Warning: Unknown output_format %s. Defaulting to BASIC." % (output_format,))
+            return_obj = {
+                "success" : bool(result_obj["success"]),
+                "true_value" : result_obj["true_value"],
+            }
+
+        return return_obj
+
     def calc_map_expectation_success(self, success_count, nonnull_count, exception_count, mostly):
         if nonnull_count > 0:
             percent_success = float(success_count)/nonnull_count
@@ -388,12 +633,16 @@ class DataSet(object):
 
     ##### Missing values, unique values, and types #####
 
-    def expect_column_values_to_be_unique(self, column, mostly=None, suppress_exceptions=False):
+    def expect_column_values_to_be_unique(self, column, mostly=None, suppress_exceptions=False, approximate=False):
         """Expect each nonempty column entry to be unique (no duplicates).
         Args:
             column (str): The column name.
         Keyword Args:
             mostly=None: Return "success": True if the percentage of unique values is greater than or equal to mostly (a float between 0 and 1).
+            approximate (bool): If True, compare 64-bit hashes of the values instead of the values themselves, which \
+                takes 8 bytes per row whatever the size of the values. Distinct values whose hashes collide are reported \
+                as duplicates; among n distinct values that happens with probability about n**2 / 2**65 (3e-4 for 100 \
+                million values). Object columns of mixed types are always compared exactly.
         Returns:
             dict:
                 {
@@ -686,12 +935,17 @@ class DataSet(object):
         """
         raise NotImplementedError
 
-    def expect_column_median_to_be_between(self, column, min_value, max_value):
+    def expect_column_median_to_be_between(self, column, min_value, max_value, approximate=False, k=200):
         """Expect the column median to be between a minimum value and a maximum value.
         Args:
             column (str): The column name.
             min_value (int or None): The minimum value for the column median.
             max_value (int or None): The maximum value for the column median.
+            approximate (bool): If True, estimate the median with a KLL quantile sketch, which keeps at most about \
+                3 * k values and can be merged across chunks. The rank of the estimate is then within about \
+                2.3 / k**0.97 of one half with 99% confidence (1.3% of the values for k=200), reported as rank_error \
+                in the summary_obj.
+            k (int): The size of the sketch, which sets the accuracy and the memory footprint.
         Returns:
             dict:
                 {
@@ -717,30 +971,45 @@ class DataSet(object):
         """
         raise NotImplementedError
 
-    def expect_column_unique_value_count_to_be_between(self, column, min_value, max_value, output_format=None):
+    def expect_column_unique_value_count_to_be_between(self, column, min_value, max_value, output_format=None,
+                                                       approximate=False, relative_error=0.01):
         """Expect the number of unique values to be between a minimum value and a maximum value.
 
         Args:
             column (str): The column name.
             min_value (int or None): The minimum number of unique values. If None, then there is no minimium expected value.
             max_value (int or None): The maximum number of unique values. If None, then there is no maximum expected value.
+            approximate (bool): If True, estimate the number of unique values with a HyperLogLog sketch instead of \
+                counting every value. Memory use is then bounded by the sketch size rather than the number of unique values.
+            relative_error (float): The largest acceptable relative standard error of the approximate count. \
+                The sketch uses 2**p registers, with p the smallest integer such that 1.04 / sqrt(2**p) <= relative_error \
+                (and at least 4). p is at most 18, so a relative_error below about 0.002 raises ValueError.
 
         Returns:
             dict:
                 {
                     "success": (bool) True if the column passed the expectation,
-                    "true_value": (float) the column mean
+                    "true_value": (float) the number of unique values (an estimate if approximate is True),
+                    "summary_obj": {
+                        "approximate": (bool) True for an approximate count,
+                        "relative_error": (float) the relative standard error of the estimate,
+                        "confidence_interval": (list) the estimate plus or minus two standard errors (about 95%)
+                    } if approximate is True, otherwise {}
                 }
         """
         raise NotImplementedError
 
-    def expect_column_proportion_of_unique_values_to_be_between(self, column, min_value, max_value, output_format=None):
+    def expect_column_proportion_of_unique_values_to_be_between(self, column, min_value, max_value, output_format=None,
+                                                                approximate=False, relative_error=0.01):
         """Expect the proportion of unique values to be between a minimum value and a maximum value.
 
         Args:
             column (str): The column name.
             min_value (float or None): The minimum proportion of unique values. (Proportions are on the range 0 to 1)
             max_value (float or None): The maximum proportion of unique values. (Proportions are on the range 0 to 1)
+            approximate (bool): If True, estimate the number of unique values with a HyperLogLog sketch. \
+                See expect_column_unique_value_count_to_be_between.
+            relative_error (float): The largest acceptable relative standard error of the approximate count.
 
         Returns:
             dict:
@@ -761,6 +1030,8 @@ class DataSet(object):
             partition_object (dict): A dictionary containing partition (categorical values) and associated weights.
                 - partition (list): A list of values that correspond to the provided categorical values.
                 - weights (list): A list of weights. They should sum to one. The test will scale the expected frequencies by the weights and size of the new sample.
+                - other_weight (float): Optional. The weight of all the values not in partition, which are then tested as one more category \
+                    and need not be listed. The weights and other_weight should sum to one.
             p (float) = 0.05: The p-value threshold for the Chai Squareed test.\
                 For values below the specified threshold the expectation will return false, rejecting the null hypothesis that the distributions are the same.
             suppress_exceptions: Only return a boolean success value, not a dictionary with other results.
@@ -773,7 +1044,8 @@ class DataSet(object):
         """
         raise NotImplementedError
 
-    def expect_column_bootstrapped_ks_test_p_value_greater_than(self, series, partition_object=None, p=0.05, bootstrap_samples=0):
+    def expect_column_bootstrapped_ks_test_p_value_greater_than(self, series, partition_object=None, p=0.05, bootstrap_samples=0,
+                                                                random_state=None, n_jobs=1):
         """
         Expect the values in this column to match the distribution implied by the specified partition and cdf_vals. \
         The implied CDF is constructed as a linear interpolation of the provided cdf_vals.
@@ -787,6 +1059,10 @@ class DataSet(object):
                 For values below the specified threshold the expectation will return false, rejecting the null hypothesis that the distributions are the same.
             bootstrap_samples (int) = 0: The number of bootstrapping rounds to use in building the estimated pvalue. \
                 If zero, chooses a default number of rounds (currently 1000, but may be altered based on size of dataset).
+            random_state (int or None) = None: Seed for the bootstrap samples, to make the pvalue reproducible. \
+                If None, the seed is drawn from numpy's global random state.
+            n_jobs (int) = 1: The number of processes to run the bootstrapping rounds in; -1 uses one process per CPU. \
+                The pvalue for a given random_state does not depend on n_jobs.
         Returns:
             {
                 "success": (bool) True if the column passed the expectation,
@@ -804,6 +1080,8 @@ class DataSet(object):
             partition_object (dict): A dictionary containing partition (bin edges) and associated weights.
                 - partition (list): A list of values that correspond to the endpoints of an implied partition on the real number line.
                 - weights (list): A list of weights. They should sum to one.
+                - other_weight (float): Optional, for categorical partitions only. The weight of all the values not in partition, \
+                    which are then treated as one more category. The weights and other_weight should sum to one.
             threshold (float) = 0.1: The threshold of relative entropy.\
                 For values above the specified threshold the expectation will return false.
             suppress_exceptions: Only return a boolean success value, not a dictionary with other results.
@@ -0,0 +1,116 @@
+"""
+Batched bootstrap of the Kolmogorov-Smirnov test against the CDF implied by a partition object.
+
+Bootstrap samples are drawn in blocks of block_size rounds. Each block is one matrix of resampled values with its own
+seed, so a block can be evaluated in any process and the p-values only depend on the seed the blocks were derived
+from, not on the number of processes.
+"""
+
+import multiprocessing
+
+import numpy as np
+from scipy import stats
+
+# Rounds per block. The largest block matrix is block_size * sample_size values.
+block_size = 100
+
+
+def partition_cdf(partition_object):
+    """Return the points (x, cdf) of the piecewise-linear CDF implied by a continuous partition object."""
+    return (np.asarray(partition_object['partition'], dtype=float),
+            np.append(np.array([0.]), np.cumsum(partition_object['weights'])))
+
+
+def ks_test_p_values(samples, cdf_x, cdf_y):
+    """Two-sided KS test p-values of each row of a matrix of samples against a piecewise-linear CDF.
+
+    The p-values are those of scipy.stats.kstest with its default arguments: from the exact distribution of the
+    two-sided statistic (scipy.stats.kstwo) where scipy has it. Older versions of scipy default to mode='approx',
+    which uses the asymptotic Kolmogorov distribution, or twice the one-sided exact distribution for small samples
+    that are far from the CDF.
+    """
+    n = samples.shape[1]
+    cdf_values = np.interp(np.sort(samples, axis=1), cdf_x, cdf_y)
+
+    d_plus = (np.arange(1., n + 1) / n - cdf_values).max(axis=1)
+    d_minus = (cdf_values - np.arange(0., n) / n).max(axis=1)
+    d = np.maximum(d_plus, d_minus)
+
+    if hasattr(stats, "kstwo"):
+        return np.clip(stats.kstwo.sf(d, n), 0., 1.)
+
+    p_values = stats.kstwobign.sf(d * np.sqrt(n))
+    if n <= 2666:
+        exact = p_values <= 0.80 - n * 0.3 / 1000
+        p_values[exact] = 2 * stats.ksone.sf(d[exact], n)
+    return p_values
+
+
+def _bootstrap_block(values, cdf_x, cdf_y, sample_size, rounds, seed):
+    random = np.random.RandomState(seed)
+    samples = values[random.randint(0, len(values), size=(rounds, sample_size))]
+    return ks_test_p_values(samples, cdf_x, cdf_y)
+
+
+# Worker processes receive the column once, when they start
+_worker_args = None
+
+
+def _init_worker(values, cdf_x, cdf_y, sample_size):
+    global _worker_args
+    _worker_args = (values, cdf_x, cdf_y, sample_size)
+
+
+def _bootstrap_worker_block(block):
+    rounds, seed = block
+    return _bootstrap_block(*(_worker_args + (rounds, seed)))
+
+
+def bootstrap_ks_test_p_values(values, partition_object, bootstrap_samples, sample_size=None, random_state=None,
+                               n_jobs=1):
+    """KS test p-values of bootstrap_samples resamples of values against the CDF implied by partition_object.
+
+    Args:
+        values (list-like): the nonnull numeric values to resample.
+        partition_object (dict): a continuous partition object.
+        bootstrap_samples (int): the number of resamples.
+        sample_size (int or None): the size of each resample. Defaults to the number of partition weights.
+        random_state (int or None): seed for the resamples. If None, the seed is drawn from numpy's global random \
+            state, so np.random.seed also makes results reproducible.
+        n_jobs (int): the number of processes to evaluate blocks of resamples in. -1 uses one process per CPU.
+
+    Returns:
+        A numpy array of bootstrap_samples p-values.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        raise ValueError("Cannot bootstrap an empty column.")
+    if bootstrap_samples < 1:
+        raise ValueError("bootstrap_samples must be at least one.")
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a positive number of processes, or negative to use one process per CPU.")
+    if n_jobs < 0:
+        n_jobs = multiprocessing.cpu_count()
+    if sample_size is None:
+        sample_size = len(partition_object['weights'])
+    cdf_x, cdf_y = partition_cdf(partition_object)
+
+    if random_state is None:
+        random = np.random
+    else:
+        random = np.random.RandomState(random_state)
+    n_blocks = int(np.ceil(bootstrap_samples / float(block_size)))
+    seeds = random.randint(0, 2 ** 31 - 1, size=n_blocks)
+    blocks = [(min(block_size, bootstrap_samples - block * block_size), seed) for block, seed in enumerate(seeds)]
+
+    if n_jobs > 1 and n_blocks > 1:
+        pool = multiprocessing.Pool(min(n_jobs, n_blocks), _init_worker, (values, cdf_x, cdf_y, sample_size))
+        try:
+            p_values = pool.map(_bootstrap_worker_block, blocks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        p_values = [_bootstrap_block(values, cdf_x, cdf_y, sample_size, rounds, seed) for rounds, seed in blocks]
+
+    return np.concatenate(p_values)
@@ -1,5 +1,6 @@
 import inspect
 import json
+import numbers
 import re
 from datetime import datetime
 from functools import wraps
@@ -9,15 +10,442 @@ import pandas as pd
 from dateutil.parser import parse
 from scipy import stats
 
+from .aggregate_states import (
+    aggregate_state, ColumnMeanState, ColumnStdevState, ColumnQuantileState,
+    ColumnDistinctCountState, ColumnDistributionState
+)
 from .base import DataSet
-from .util import is_valid_partition_object, remove_empty_intervals
+from .bootstrap import bootstrap_ks_test_p_values
+from .sketches import hash_values
+from .util import DotDict, is_valid_partition_object
+
+
+def not_row_wise(func):
+    """Mark a column_map_expectation function whose result for a row depends on other rows (for instance uniqueness),
+    so that it is always evaluated on the whole column rather than chunk by chunk."""
+    func.row_wise = False
+    return func
+
+
+python_avro_types = {
+        "null":type(None),
+        "boolean":bool,
+        "int":int,
+        "long":int,
+        "float":float,
+        "double":float,
+        "bytes":bytes,
+        "string":str
+        }
+
+numpy_avro_types = {
+        "null":np.nan,
+        "boolean":np.bool_,
+        "int":np.int64,
+        "long":np.longdouble,
+        "float":np.float_,
+        "double":np.longdouble,
+        "bytes":np.bytes_,
+        "string":np.string_
+        }
+
+avro_types = {"python":python_avro_types, "numpy":numpy_avro_types}
+
+
+def _value_types_in(column, target_type_list):
+    """Vectorized equivalent of column.map(lambda x: type(x) in target_type_list).
+
+    Series.map boxes every element of a column with a numpy dtype to the same type, so one element answers for the
+    whole column. Categorical columns are answered once per category. Object columns take one pass of type() over the
+    values and a hash lookup of the resulting types.
+    """
+    if len(column) == 0:
+        return pd.Series([], index=column.index, dtype=bool)
+
+    if pd.api.types.is_categorical_dtype(column):
+        category_types_in = np.asarray(_value_types_in(pd.Series(column.cat.categories), target_type_list))
+        return pd.Series(category_types_in[column.cat.codes.values], index=column.index)
+
+    if column.dtype.kind != 'O':
+        boxed_type = column.iloc[:1].map(type).iloc[0]
+        return pd.Series(boxed_type in target_type_list, index=column.index)
+
+    value_types = pd.Series(list(map(type, column.values)), index=column.index, dtype=object)
+    return _is_in_set(value_types, target_type_list)
+
+
+def _is_in_set(column, value_set):
+    """Vectorized equivalent of column.map(lambda x: x in value_set).
+
+    Categorical columns look up each category once and broadcast through the codes. Numeric columns are matched by
+    binary search in the sorted set, which stays O(n log m) on long columns where isin would sort the whole column.
+    Object and boolean columns are looked up in a hash table of the set. Other dtypes, and value sets that are not plain
+    collections of hashable values, fall back to a per-row membership test against a set built once.
+    """
+    if value_set is None or isinstance(value_set, (str, bytes, dict)):
+        return column.map(lambda x: x in value_set)
+
+    value_set = list(value_set)
+
+    if pd.api.types.is_categorical_dtype(column):
+        category_in_set = np.asarray(_is_in_set(pd.Series(column.cat.categories), value_set))
+        return pd.Series(category_in_set[column.cat.codes.values], index=column.index, name=column.name)
+
+    try:
+        set_values = np.array(value_set)
+    except ValueError:
+        set_values = np.array([], dtype=object)
+
+    if column.dtype.kind in 'iuf' and set_values.ndim == 1 and \
+            (set_values.dtype.kind == column.dtype.kind or (column.dtype.kind == 'f' and set_values.dtype.kind in 'iu')):
+        if len(set_values) == 0:
+            return pd.Series(False, index=column.index, name=column.name)
+
+        sorted_values = np.unique(set_values)
+        positions = np.searchsorted(sorted_values, column.values).clip(0, len(sorted_values) - 1)
+        return pd.Series(sorted_values[positions] == column.values, index=column.index, name=column.name)
+
+    if column.dtype.kind in 'Ob':
+        try:
+            set_index = pd.Index(value_set, dtype=object).unique()
+            return pd.Series(set_index.get_indexer(column.values.astype(object)) >= 0, index=column.index, name=column.name)
+        except TypeError:
+            # Unhashable members
+            return column.map(lambda x: x in value_set)
+
+    try:
+        value_set = set(value_set)
+    except TypeError:
+        pass
+    return column.map(lambda x: x in value_set)
+
+
+def _bounds_comparable(column, bounds):
+    """True if every bound that is not None can be compared to the column with a vectorized operator that gives the
+    same result as comparing each value in Python: numbers for numeric columns, datetimes for datetime64 columns."""
+    if column.dtype.kind in 'iuf':
+        bound_types = (numbers.Real,)
+    elif column.dtype.kind == 'M' and getattr(column.dtype, 'tz', None) is None:
+        bound_types = (datetime, np.datetime64)
+    else:
+        return False
+
+    return all(bound is None or isinstance(bound, bound_types) for bound in bounds)
+
+
+def _string_lengths(column):
+    """Lengths of the values of a string column, computed once per category for categorical columns. Returns None if
+    some values may not have a length, so that the caller can fall back to calling len on each value."""
+    if pd.api.types.is_categorical_dtype(column):
+        category_lengths = _string_lengths(pd.Series(column.cat.categories))
+        if category_lengths is None:
+            return None
+        return pd.Series(category_lengths.values[column.cat.codes.values], index=column.index)
+
+    if column.dtype.kind == 'O' and pd.api.types.infer_dtype(column) in ["string", "unicode", "bytes"]:
+        return pd.Series(np.fromiter(map(len, column.values), dtype=np.int64, count=len(column)), index=column.index)
+
+    return None
+
+
+def _string_values(column):
+    """The values of a column as str, equivalent to column.map(str) but without converting columns of strings."""
+    if pd.api.types.infer_dtype(column) in ["string", "unicode"]:
+        return column.values
+    else:
+        return [str(value) for value in column.astype(object).values]
+
+
+def _regex_matches(column, match_function):
+    """Apply the search or match method of a compiled pattern to every value, as a boolean Series.
+
+    Values are only converted with str() if the column doesn't already hold strings.
+    """
+    values = _string_values(column)
+    return pd.Series([match_function(value) is not None for value in values], index=column.index, dtype=bool)
+
+
+def _strptime_matches(column, strftime_format):
+    """Vectorized equivalent of testing datetime.strptime(str(x), strftime_format) on every value.
+
+    Each distinct value is tested once. pd.to_datetime parses them in bulk with the same format and exact matching,
+    but pandas is more lenient than strptime in places (leap seconds, nanoseconds) and rejects dates it can't
+    represent (for instance out of bounds years). A value is therefore only accepted without strptime if pandas parses
+    it and formatting the result gives back the same string; every other value is passed to strptime itself.
+    """
+    values = _string_values(column)
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    uniques = np.asarray(uniques, dtype=object)
+
+    unique_matches = np.zeros(len(uniques), dtype=bool)
+    try:
+        parsed = pd.to_datetime(uniques, format=strftime_format, exact=True, errors='coerce')
+    except ValueError:
+        # Formats that pandas can't apply, or offsets it can't combine into one column
+        parsed = None
+    if isinstance(parsed, pd.DatetimeIndex):
+        accepted = np.asarray(pd.notnull(parsed), dtype=bool)
+        unique_matches[accepted] = np.asarray(parsed[accepted].strftime(strftime_format), dtype=object) == \
+            uniques[accepted]
+
+    for position in np.flatnonzero(~unique_matches):
+        try:
+            datetime.strptime(uniques[position], strftime_format)
+            unique_matches[position] = True
+        except ValueError:
+            pass
+
+    return pd.Series(unique_matches[codes], index=column.index)
+
+
+_iso_datetime_regex = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+
+def _dateutil_parseable(column):
+    """Vectorized equivalent of testing dateutil.parser.parse on every value.
+
+    Each distinct value is tested once. Distinct values in plain ISO 8601 form are parsed in bulk by pd.to_datetime;
+    dateutil parses all of those that pandas accepts. The others are passed to dateutil itself.
+    """
+    def is_parseable(val):
+        try:
+            parse(val)
+            return True
+        except:
+            return False
+
+    if pd.api.types.is_categorical_dtype(column):
+        codes, uniques = column.cat.codes.values, column.cat.categories
+    else:
+        try:
+            codes, uniques = pd.factorize(column.values)
+        except TypeError:
+            # Unhashable values
+            return column.map(is_parseable)
+
+    uniques = np.asarray(uniques, dtype=object)
+    unique_parseable = np.zeros(len(uniques), dtype=bool)
+
+    iso = np.array([isinstance(value, str) and _iso_datetime_regex.match(value) is not None for value in uniques],
+                   dtype=bool)
+    if iso.any():
+        unique_parseable[iso] = pd.notnull(pd.to_datetime(uniques[iso], errors='coerce'))
+
+    for position in np.flatnonzero(~unique_parseable):
+        unique_parseable[position] = is_parseable(uniques[position])
+
+    # Nulls, which factorize leaves out of the uniques, aren't parseable
+    parseable = np.zeros(len(codes), dtype=bool)
+    parseable[codes >= 0] = unique_parseable[codes[codes >= 0]]
+    return pd.Series(parseable, index=column.index)
+
+
+def _column_fingerprint(series):
+    """Identify the array that holds the values of a column. The scan that keeps the fingerprint also keeps the column,
+    so the array can't be freed and its address or id reused by another array."""
+    values = series.values
+    if isinstance(values, np.ndarray):
+        return (values.__array_interface__["data"][0], values.shape, values.strides, values.dtype.str)
+    return (id(values), len(values))
+
+
+def _first_true_positions(mask, count, block_size=65536):
+    """Return the positions of the first count True values of a boolean array, searching it block by block so that
+    only the positions that are returned are materialized."""
+    positions = []
+    for start in range(0, len(mask), block_size):
+        block_positions = np.flatnonzero(mask[start:start + block_size])[:count - len(positions)]
+        positions.extend(block_positions + start)
+        if len(positions) >= count:
+            break
+    return np.array(positions, dtype=np.int64)
 
 
 class MetaPandasDataSet(DataSet):
 
+    # BOOLEAN_ONLY column map expectations are evaluated on chunks of rows that grow from the first size to the
+    # second, so that failures near the top of a column are found early without paying a per-chunk overhead on long
+    # columns that pass.
+    short_circuit_chunk_sizes = (1000, 100000)
+
+    # Row-wise column map functions are evaluated once per distinct value of categorical columns, and of string
+    # columns with at least distinct_value_min_rows values of which at most distinct_value_max_ratio are distinct in
+    # an evenly spaced sample of distinct_value_sample_size values. The results are broadcast back through the codes.
+    distinct_value_min_rows = 1000
+    distinct_value_max_ratio = 0.5
+    distinct_value_sample_size = 1000
+
     def __init__(self, *args, **kwargs):
         super(MetaPandasDataSet, self).__init__(*args, **kwargs)
 
+    def enable_column_statistics_cache(self, enabled=True):
+        """Keep column scans and the statistics derived from them (value counts, sorted values) between expectations.
+
+        By default a column is scanned once per validate() call, and on every call of an expectation outside validate().
+        With the cache enabled, scans are kept until the data set is modified, so expectations that are re-run on
+        unchanged columns reuse them. A cached scan is only used while its column holds the same values array, and
+        modifications through pandas (assignment, .loc, .at, inplace methods, del) clear the cache; writes to the
+        underlying numpy arrays (for example through .values) are not seen, so call clear_column_statistics_cache
+        after those. The cache holds a copy of the nonnull values of every column it has scanned.
+        """
+        self._cache_column_statistics = enabled
+        self._column_scans = {} if enabled else None
+
+    def clear_column_statistics_cache(self, column=None):
+        """Drop the cached scan of column, or of every column if column is None."""
+        column_scans = getattr(self, "_column_scans", None)
+        if column_scans is None:
+            return
+        if column is None:
+            column_scans.clear()
+        else:
+            column_scans.pop(column, None)
+
+    def column_statistics_cache_info(self):
+        """Return the number of column scan and statistic lookups served from a shared scan (hits) or computed
+        (misses) since the data set was created, and the columns currently cached."""
+        return {
+            "enabled": self._cache_column_statistics,
+            "hits": self._column_statistics_hits,
+            "misses": self._column_statistics_misses,
+            "columns": list(self._column_scans or [])
+        }
+
+    def get_column_scan(self, column):
+        """Return the null mask and nonnull values of a column.
+
+        While validate() is running, the scan is computed once per column and shared by every expectation on that
+        column; otherwise it is computed on each call, unless the column statistics cache is enabled.
+
+        Returns:
+            DotDict: series, null_mask, nonnull_mask, nonnull_values, nonnull_count, element_count and fingerprint
+        """
+        series = self[column]
+        fingerprint = _column_fingerprint(series)
+
+        if self._column_scans is not None and column in self._column_scans:
+            scan = self._column_scans[column]
+            # A scan kept by the cache is only reused if the column still holds the same values array
+            if not self._cache_column_statistics or scan.fingerprint == fingerprint:
+                self._column_statistics_hits += 1
+                return scan
+
+        self._column_statistics_misses += 1
+
+        null_mask = series.isnull()
+        nonnull_mask = ~null_mask
+
+        scan = DotDict({
+            "series": series,
+            "null_mask": null_mask,
+            "nonnull_mask": nonnull_mask,
+            "nonnull_values": series[nonnull_mask],
+            "nonnull_count": nonnull_mask.sum(),
+            "element_count": int(len(series)),
+            "fingerprint": fingerprint,
+        })
+
+        if self._column_scans is not None:
+            self._column_scans[column] = scan
+
+        return scan
+
+    def _get_exceptions(self, values, exception_mask, output_format):
+        """Return the exception values, their index and the exception count, materializing only as many exceptions as
+        output_format returns: none for BOOLEAN_ONLY, the first 20 for BASIC and all of them otherwise."""
+        exception_mask = np.asarray(exception_mask, dtype=bool)
+        exception_count = int(np.count_nonzero(exception_mask))
+
+        if output_format == "BOOLEAN_ONLY":
+            exception_positions = np.array([], dtype=np.int64)
+        elif output_format == "BASIC" and exception_count > 20:
+            exception_positions = _first_true_positions(exception_mask, 20)
+        else:
+            exception_positions = np.flatnonzero(exception_mask)
+
+        exceptions = values.iloc[exception_positions]
+        return list(exceptions), list(exceptions.index), exception_count
+
+    def _get_scan_statistic(self, scan, name, compute):
+        # Statistics are kept in the scan, so they are shared for as long as the scan is
+        if name in scan:
+            self._column_statistics_hits += 1
+        else:
+            self._column_statistics_misses += 1
+            scan[name] = compute(scan.nonnull_values)
+        return scan[name]
+
+    def get_column_value_counts(self, column, scan=None):
+        """Return the value counts of the nonnull values of a column, most frequent first. Do not modify the result.
+        Pass the column's scan if it is already at hand, so that the column is not scanned again."""
+        if scan is None:
+            scan = self.get_column_scan(column)
+        return self._get_scan_statistic(scan, "value_counts", lambda values: values.value_counts())
+
+    def get_column_sorted_values(self, column, scan=None):
+        """Return the nonnull values of a column as a sorted numpy array. Do not modify the result. scan is as in
+        get_column_value_counts."""
+        if scan is None:
+            scan = self.get_column_scan(column)
+        return self._get_scan_statistic(scan, "sorted_values", lambda values: np.sort(values.values))
+
+    def _get_distinct_values(self, scan):
+        """Return (codes, distinct values) for the nonnull values of a column scan, or None if the column is not
+        worth evaluating per distinct value."""
+        return self._get_scan_statistic(scan, "distinct_values", self._factorize_repeated_values)
+
+    def _factorize_repeated_values(self, values):
+        if pd.api.types.is_categorical_dtype(values):
+            if len(values.cat.categories) >= len(values):
+                return None
+            return values.cat.codes.values, pd.Series(values.cat.categories, name=values.name)
+
+        if len(values) < self.distinct_value_min_rows or values.dtype.kind != 'O':
+            return None
+        # Values that compare equal are evaluated once, so only factorize columns of one type
+        if pd.api.types.infer_dtype(values) not in ["string", "unicode", "bytes"]:
+            return None
+
+        sample = values.values[::max(len(values) // self.distinct_value_sample_size, 1)]
+        if len(pd.unique(sample)) > self.distinct_value_max_ratio * len(sample):
+            return None
+
+        codes, uniques = pd.factorize(values.values)
+        return codes, pd.Series(uniques, dtype=object, name=values.name)
+
+    def _short_circuit_map_success(self, func, nonnull_values, nonnull_count, mostly, args, kwargs):
+        """Evaluate a row-wise column map function chunk by chunk, and stop as soon as the outcome is known to be a
+        failure: at the first exception without mostly, or once too few rows can succeed with it."""
+        chunk_size, max_chunk_size = self.short_circuit_chunk_sizes
+        success_count = 0
+        exception_count = 0
+        start = 0
+
+        while start < nonnull_count:
+            chunk = nonnull_values.iloc[start:start + chunk_size]
+            boolean_mapped_success_values = func(self, chunk, *args, **kwargs)
+            success_count += boolean_mapped_success_values.sum()
+            exception_count += int((boolean_mapped_success_values == False).sum())
+            start += len(chunk)
+
+            if mostly:
+                max_success_count = success_count + (nonnull_count - start)
+                if float(max_success_count) / nonnull_count < mostly:
+                    return False
+            elif exception_count > 0:
+                return False
+
+            chunk_size = min(2 * chunk_size, max_chunk_size)
+
+        success, percent_success = self.calc_map_expectation_success(success_count, nonnull_count, exception_count, mostly)
+        return success
+
+    def _column_subset(self, column):
+        if column in self.columns:
+            return pd.DataFrame(self[[column]])
+        else:
+            return pd.DataFrame(index=self.index)
+
     @classmethod
     def column_map_expectation(cls, func):
         """
@@ -29,6 +457,11 @@ class MetaPandasDataSet(DataSet):
         logic while preserving the standard DataSet signature and expected behavior.
 
         Further, the column_map_expectation provides a unique set of output_format options and handles the optional "mostly" parameter.
+
+        With output_format="BOOLEAN_ONLY", the function may be called on successive chunks of the column and
+        evaluation stops once the expectation is known to fail. On categorical columns and string columns with
+        repeated values, the function may instead be called once with the distinct values of the column. Functions
+        whose result for a row depends on other rows must be decorated with not_row_wise.
         """
 
         @cls.expectation(inspect.getargspec(func)[0][1:])
@@ -38,19 +471,32 @@ class MetaPandasDataSet(DataSet):
             if output_format is None:
                 output_format = self.default_expectation_args["output_format"]
 
-            series = self[column]
-            boolean_mapped_null_values = series.isnull()
+            scan = self.get_column_scan(column)
+            boolean_mapped_null_values = scan.null_mask
 
-            element_count = int(len(series))
-            nonnull_values = series[boolean_mapped_null_values==False]
-            nonnull_count = (boolean_mapped_null_values==False).sum()
+            element_count = scan.element_count
+            nonnull_values = scan.nonnull_values
+            nonnull_count = scan.nonnull_count
 
-            boolean_mapped_success_values = func(self, nonnull_values, *args, **kwargs)
+            row_wise = getattr(func, "row_wise", True)
+            distinct_values = self._get_distinct_values(scan) if row_wise else None
+
+            if distinct_values is not None:
+                codes, uniques = distinct_values
+                distinct_success_values = np.asarray(func(self, uniques, *args, **kwargs))
+                boolean_mapped_success_values = pd.Series(distinct_success_values[codes], index=nonnull_values.index)
+
+            # Pass/fail gates don't need to look past the first decisive failure
+            elif output_format == "BOOLEAN_ONLY" and row_wise and nonnull_count > self.short_circuit_chunk_sizes[0]:
+                return self._short_circuit_map_success(func, nonnull_values, nonnull_count, mostly, args, kwargs)
+
+            else:
+                boolean_mapped_success_values = func(self, nonnull_values, *args, **kwargs)
             success_count = boolean_mapped_success_values.sum()
 
-            exception_list = list(series[(boolean_mapped_success_values==False)&(boolean_mapped_null_values==False)])
-            exception_index_list = list(series[(boolean_mapped_success_values==False)&(boolean_mapped_null_values==False)].index)
-            exception_count = len(exception_list)
+            exception_list, exception_index_list, exception_count = self._get_exceptions(
+                nonnull_values, boolean_mapped_success_values == False, output_format
+            )
 
             success, percent_success = self.calc_map_expectation_success(success_count, nonnull_count, exception_count, mostly)
 
@@ -59,13 +505,16 @@ class MetaPandasDataSet(DataSet):
                 element_count,
                 nonnull_values, nonnull_count,
                 boolean_mapped_success_values, success_count,
-                exception_list, exception_index_list
+                exception_list, exception_index_list,
+                exception_count=exception_count
             )
 
             return return_obj
 
         inner_wrapper.__name__ = func.__name__
         inner_wrapper.__doc__ = func.__doc__
+        inner_wrapper._expectation_kind = "column_map"
+        inner_wrapper._row_wise = getattr(func, "row_wise", True)
         return inner_wrapper
 
 
@@ -80,22 +529,35 @@ class MetaPandasDataSet(DataSet):
         expectation logic while preserving the standard DataSet signature and expected behavior.
 
         Further, the column_aggregate_expectation provides a unique set of output_format options.
+
+        If the implementing function declares a ColumnAggregateState with the aggregate_state decorator, it receives
+        a state updated with the nonnull values of the column instead of the values themselves. The same function can
+        then be evaluated from states built incrementally or over partitions and merged (see StreamingValidator).
         """
-        @cls.expectation(inspect.getargspec(func)[0][1:])
+        state_class = getattr(func, "aggregate_state", None)
+        arg_names = inspect.getargspec(func)[0][2:]
+
+        @cls.expectation(['column'] + arg_names)
         @wraps(func)
         def inner_wrapper(self, column, output_format = None, *args, **kwargs):
 
             if output_format is None:
                 output_format = self.default_expectation_args["output_format"]
 
-            series = self[column]
-            null_indexes = series.isnull()
+            scan = self.get_column_scan(column)
 
-            nonnull_values = series[null_indexes == False]
-            nonnull_count = (null_indexes == False).sum()
-            null_count = nonnull_count - len(series)
+            nonnull_values = scan.nonnull_values
+            nonnull_count = scan.nonnull_count
+            null_count = nonnull_count - scan.element_count
 
-            result_obj = func(self, nonnull_values, *args, **kwargs)
+            if state_class is None:
+                result_obj = func(self, nonnull_values, *args, **kwargs)
+            else:
+                state_kwargs = dict(zip(arg_names, args))
+                state_kwargs.update(kwargs)
+                state = state_class(**state_kwargs)
+                state.update_column(self, column, scan)
+                result_obj = func(self, state, *args, **kwargs)
 
             #!!! This would be the right place to validate result_obj
             #!!! It should contain:
@@ -103,43 +565,11 @@ class MetaPandasDataSet(DataSet):
             #!!!    true_value: int or float
             #!!!    summary_obj: json-serializable dict
 
-            if output_format in ["BASIC", "COMPLETE"]:
-                return_obj = {
-                    "success" : bool(result_obj["success"]),
-                    "true_value" : result_obj["true_value"],
-                }
-
-            elif (output_format == "SUMMARY"):
-                if "summary_obj" in result_obj and result_obj["summary_obj"] is not None:
-                    result_obj["summary_obj"].update({
-                        "element_count": nonnull_count,
-                        "missing_count": null_count,
-                        "missing_percent": nonnull_count / null_count if null_count > 0 else 0
-                    })
-                else:
-                    result_obj["summary_obj"] = {
-                        "element_count": nonnull_count,
-                        "missing_count": null_count,
-                        "missing_percent": nonnull_count / null_count if null_count > 0 else 0
-                    }
-                return_obj = {
-                    "success" : bool(result_obj["success"]),
-                    "true_value" : result_obj["true_value"],
-                    "summary_obj" : result_obj["summary_obj"]
-                }
-
-            elif output_format=="BOOLEAN_ONLY":
-                return_obj = bool(result_obj["success"])
-
-            else:
-                print ("Warning: Unknown output_format %s. Defaulting to BASIC." % (output_format,))
-                return_obj = {
-                    "success" : bool(result_obj["success"]),
-                    "true_value" : result_obj["true_value"],
-                }
-
-            return return_obj
+            return self.format_column_aggregate_output(output_format, result_obj, nonnull_count, null_count)
 
+        inner_wrapper._expectation_kind = "column_aggregate"
+        inner_wrapper._aggregate_state = state_class
+        inner_wrapper._aggregate_function = func
         return inner_wrapper
 
 
@@ -148,6 +578,29 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
     def __init__(self, *args, **kwargs):
         super(PandasDataSet, self).__init__(*args, **kwargs)
 
+    ### Column statistics cache invalidation ###
+
+    # Cached scans are checked against the column's values array when they are looked up (see get_column_scan). With
+    # copy-on-write, any modification gives the column a new array. Older pandas versions write into the same array,
+    # so the cache is also cleared whenever pandas clears its own cache of column Series, if these hooks exist.
+
+    def _clear_item_cache(self, *args, **kwargs):
+        super(PandasDataSet, self)._clear_item_cache(*args, **kwargs)
+        self.clear_column_statistics_cache()
+
+    def _maybe_cache_changed(self, item, value):
+        super(PandasDataSet, self)._maybe_cache_changed(item, value)
+        self.clear_column_statistics_cache(item)
+
+    def __delitem__(self, key):
+        super(PandasDataSet, self).__delitem__(key)
+        self.clear_column_statistics_cache(key)
+
+    def set_value(self, *args, **kwargs):
+        result = super(PandasDataSet, self).set_value(*args, **kwargs)
+        self.clear_column_statistics_cache()
+        return result
+
     ### Expectation methods ###
 
     @DataSet.expectation(['column'])
@@ -188,28 +641,35 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
 
 
     @MetaPandasDataSet.column_map_expectation
-    def expect_column_values_to_be_unique(self, column):
-        dupes = set(column[column.duplicated()])
-        return column.map(lambda x: x not in dupes)
+    @not_row_wise
+    def expect_column_values_to_be_unique(self, column, approximate=False):
+        # Objects of mixed types are hashed by their string form, so they are always compared exactly
+        if approximate and (column.dtype.kind != 'O' or
+                            pd.api.types.infer_dtype(column) in ["string", "unicode", "bytes"]):
+            return pd.Series(~pd.Series(hash_values(column)).duplicated(keep=False).values, index=column.index)
+
+        return ~column.duplicated(keep=False)
 
     @DataSet.expectation(['column', 'mostly', 'output_format'])
     def expect_column_values_to_not_be_null(self, column, mostly=None, output_format=None):
         if output_format == None:
             output_format = self.default_expectation_args["output_format"]
 
-        series = self[column]
-        boolean_mapped_null_values = series.isnull()
+        scan = self.get_column_scan(column)
+        series = scan.series
+        boolean_mapped_null_values = scan.null_mask
 
-        element_count = int(len(series))
-        nonnull_values = series[boolean_mapped_null_values==False]
-        nonnull_count = (boolean_mapped_null_values==False).sum()
+        element_count = scan.element_count
+        nonnull_values = scan.nonnull_values
+        nonnull_count = scan.nonnull_count
 
-        boolean_mapped_success_values = boolean_mapped_null_values==False
+        boolean_mapped_success_values = scan.nonnull_mask
         success_count = boolean_mapped_success_values.sum()
 
-        exception_list = [None for i in list(series[(boolean_mapped_success_values==False)])]
-        exception_index_list = list(series[(boolean_mapped_success_values==False)].index)
-        exception_count = len(exception_list)
+        exception_list, exception_index_list, exception_count = self._get_exceptions(
+            series, boolean_mapped_null_values, output_format
+        )
+        exception_list = [None for i in exception_list]
 
         # Pass element_count instead of nonnull_count, because that's the right denominator for this expectation
         success, percent_success = self.calc_map_expectation_success(success_count, element_count, exception_count, mostly)
@@ -219,7 +679,8 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
             element_count,
             nonnull_values, nonnull_count,
             boolean_mapped_success_values, success_count,
-            exception_list, exception_index_list
+            exception_list, exception_index_list,
+            exception_count=exception_count
         )
 
         return return_obj
@@ -229,19 +690,20 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         if output_format == None:
             output_format = self.default_expectation_args["output_format"]
 
-        series = self[column]
-        boolean_mapped_null_values = series.isnull()
+        scan = self.get_column_scan(column)
+        series = scan.series
+        boolean_mapped_null_values = scan.null_mask
 
-        element_count = int(len(series))
-        nonnull_values = series[boolean_mapped_null_values==False]
-        nonnull_count = (boolean_mapped_null_values==False).sum()
+        element_count = scan.element_count
+        nonnull_values = scan.nonnull_values
+        nonnull_count = scan.nonnull_count
 
         boolean_mapped_success_values = boolean_mapped_null_values
         success_count = boolean_mapped_success_values.sum()
 
-        exception_list = list(series[(boolean_mapped_success_values==False)])
-        exception_index_list = list(series[(boolean_mapped_success_values==False)].index)
-        exception_count = len(exception_list)
+        exception_list, exception_index_list, exception_count = self._get_exceptions(
+            series, scan.nonnull_mask, output_format
+        )
 
         # Pass element_count instead of nonnull_count, because that's the right denominator for this expectation
         success, percent_success = self.calc_map_expectation_success(success_count, element_count, exception_count, mostly)
@@ -251,86 +713,46 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
             element_count,
             nonnull_values, nonnull_count,
             boolean_mapped_success_values, success_count,
-            exception_list, exception_index_list
+            exception_list, exception_index_list,
+            exception_count=exception_count
         )
 
         return return_obj
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_of_type(self, column, type_, target_datasource="numpy"):
-        python_avro_types = {
-                "null":type(None),
-                "boolean":bool,
-                "int":int,
-                "long":int,
-                "float":float,
-                "double":float,
-                "bytes":bytes,
-                "string":str
-                }
-
-        numpy_avro_types = {
-                "null":np.nan,
-                "boolean":np.bool_,
-                "int":np.int64,
-                "long":np.longdouble,
-                "float":np.float_,
-                "double":np.longdouble,
-                "bytes":np.bytes_,
-                "string":np.string_
-                }
-
-        datasource = {"python":python_avro_types, "numpy":numpy_avro_types}
-
-        target_type = datasource[target_datasource][type_]
-        result = column.map(lambda x: type(x) == target_type)
-
-        return result
+        target_type = avro_types[target_datasource][type_]
+        return _value_types_in(column, [target_type])
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_in_type_list(self, column, type_, target_datasource="numpy"):
-
-        python_avro_types = {
-                "null":type(None),
-                "boolean":bool,
-                "int":int,
-                "long":int,
-                "float":float,
-                "double":float,
-                "bytes":bytes,
-                "string":str
-                }
-
-        numpy_avro_types = {
-                "null":np.nan,
-                "boolean":np.bool_,
-                "int":np.int64,
-                "long":np.longdouble,
-                "float":np.float_,
-                "double":np.longdouble,
-                "bytes":np.bytes_,
-                "string":np.string_
-                }
-
-        datasource = {"python":python_avro_types, "numpy":numpy_avro_types}
-
-        target_type_list = [datasource[target_datasource][t] for t in type_]
-        result = column.map(lambda x: type(x) in target_type_list)
-
-        return result
-
+        target_type_list = [avro_types[target_datasource][t] for t in type_]
+        return _value_types_in(column, target_type_list)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_in_set(self, column, value_set=None):
-        return column.map(lambda x: x in value_set)
+        return _is_in_set(column, value_set)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_not_be_in_set(self, column, value_set=None):
-        return column.map(lambda x: x not in value_set)
+        return ~_is_in_set(column, value_set)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_between(self, column, min_value=None, max_value=None):
 
+        # Numeric and datetime columns are compared in one vectorized pass when the bounds are of a comparable type
+        if (min_value is not None or max_value is not None) and _bounds_comparable(column, [min_value, max_value]):
+            try:
+                between = pd.Series(True, index=column.index)
+                if min_value is not None:
+                    between &= (min_value <= column)
+                if max_value is not None:
+                    between &= (column <= max_value)
+                return between
+            except TypeError:
+                # For instance timezone-aware bounds on a naive column; the per-value path treats these as failures
+                pass
+
         def is_between(val):
             # TODO Might be worth explicitly defining comparisons between types (for example, between strings and ints).
             # Ensure types can be compared since some types in Python 3 cannot be logically compared.
@@ -357,6 +779,17 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_value_lengths_to_be_between(self, column, min_value=None, max_value=None):
+        if (min_value is not None or max_value is not None) and \
+                all(bound is None or isinstance(bound, numbers.Real) for bound in [min_value, max_value]):
+            lengths = _string_lengths(column)
+            if lengths is not None:
+                between = pd.Series(True, index=column.index)
+                if min_value is not None:
+                    between &= (lengths >= min_value)
+                if max_value is not None:
+                    between &= (lengths <= max_value)
+                return between
+
         #TODO should the mapping function raise the error or should the decorator?
         def length_is_between(val):
 
@@ -379,28 +812,35 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_value_lengths_to_equal(self, column, value):
+        lengths = _string_lengths(column)
+        if lengths is not None and isinstance(value, numbers.Real):
+            return lengths == value
+
         return column.map(lambda x : len(x) == value)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_match_regex(self, column, regex):
-        return column.map(
-            lambda x: re.findall(regex, str(x)) != []
-        )
+        return _regex_matches(column, re.compile(regex).search)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_not_match_regex(self, column, regex):
-        return column.map(lambda x: re.findall(regex, str(x)) == [])
+        return ~_regex_matches(column, re.compile(regex).search)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_match_regex_list(self, column, regex_list):
+        patterns = [re.compile(regex) for regex in regex_list]
 
-        def match_in_list(val):
-            if any(re.match(regex, str(val)) for regex in regex_list):
-                return True
-            else:
-                return False
+        # A single alternation scans each value once. Patterns with groups are kept apart, since combining them would
+        # renumber their backreferences, and so are patterns with extensions such as inline flags.
+        if patterns and all(pattern.groups == 0 and "(?" not in pattern.pattern for pattern in patterns):
+            combined = re.compile("|".join("(?:%s)" % (pattern.pattern,) for pattern in patterns))
+            return _regex_matches(column, combined.match)
 
-        return column.map(match_in_list)
+        matched = pd.Series(False, index=column.index)
+        for pattern in patterns:
+            unmatched = ~matched
+            matched[unmatched] = _regex_matches(column[unmatched], pattern.match)
+        return matched
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_match_strftime_format(self, column, strftime_format):
@@ -411,15 +851,7 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         except ValueError as e:
             raise ValueError("Unable to use provided format. " + e.message)
 
-        def is_parseable_by_format(val):
-            try:
-                # Note explicit cast of val to str type
-                datetime.strptime(str(val), strftime_format)
-                return True
-            except ValueError as e:
-                return False
-
-        return column.map(is_parseable_by_format)
+        return _strptime_matches(column, strftime_format)
 
         #TODO Add the following to the decorator as a preliminary check.
         #if (not (column in self)):
@@ -427,14 +859,7 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_dateutil_parseable(self, column):
-        def is_parseable(val):
-            try:
-                parse(val)
-                return True
-            except:
-                return False
-
-        return column.map(is_parseable)
+        return _dateutil_parseable(column)
 
     @MetaPandasDataSet.column_map_expectation
     def expect_column_values_to_be_json_parseable(self, column):
@@ -452,10 +877,11 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         raise NotImplementedError("Under development")
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_mean_to_be_between(self, column, min_value, max_value):
+    @aggregate_state(ColumnMeanState)
+    def expect_column_mean_to_be_between(self, state, min_value, max_value):
 
         #!!! Does not raise an error if both min_value and max_value are None.
-        column_mean = column.mean()
+        column_mean = state.finalize()
 
         return {
             "success": (
@@ -467,25 +893,35 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         }
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_median_to_be_between(self, column, min_value, max_value):
+    @aggregate_state(ColumnQuantileState)
+    def expect_column_median_to_be_between(self, state, min_value, max_value, approximate=False, k=200):
 
         #!!! Does not raise an error if both min_value and max_value are None.
-        column_median = column.median()
+        column_median = state.finalize()
+
+        if state.sketch is None:
+            summary_obj = {}
+        else:
+            summary_obj = {
+                "approximate": True,
+                "rank_error": state.sketch.rank_error
+            }
 
         return {
             "success": (
-                ((min_value or None) or (min_value <= column_median)) and
-                ((max_value or None) or (column_median <= max_value))
+                ((min_value is None) or (min_value <= column_median)) and
+                ((max_value is None) or (column_median <= max_value))
             ),
             "true_value": column_median,
-            "summary_obj": {}
+            "summary_obj": summary_obj
         }
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_stdev_to_be_between(self, column, min_value, max_value):
+    @aggregate_state(ColumnStdevState)
+    def expect_column_stdev_to_be_between(self, state, min_value, max_value):
 
         #!!! Does not raise an error if both min_value and max_value are None.
-        column_stdev = column.std()
+        column_stdev = state.finalize()
 
         return {
             "success": (
@@ -497,8 +933,10 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         }
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_unique_value_count_to_be_between(self, column, min_value=None, max_value=None):
-        unique_value_count = column.value_counts().shape[0]
+    @aggregate_state(ColumnDistinctCountState)
+    def expect_column_unique_value_count_to_be_between(self, state, min_value=None, max_value=None,
+                                                       approximate=False, relative_error=0.01):
+        unique_value_count = state.finalize()
 
         return {
             "success" : (
@@ -506,38 +944,70 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
                 ((max_value is None) or (unique_value_count <= max_value))
             ),
             "true_value": unique_value_count,
-            "summary_obj": {}
+            "summary_obj": self._distinct_count_summary(state)
         }
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_proportion_of_unique_values_to_be_between(self, series, min_value=0, max_value=1):
-        unique_value_count = series.value_counts().shape[0]
-        total_value_count = int(len(series))#.notnull().sum()
+    @aggregate_state(ColumnDistinctCountState)
+    def expect_column_proportion_of_unique_values_to_be_between(self, state, min_value=0, max_value=1,
+                                                                approximate=False, relative_error=0.01):
+        unique_value_count = state.finalize()
+        total_value_count = int(state.count)
 
         if total_value_count > 0:
             proportion_unique = float(unique_value_count) / total_value_count
         else:
             proportion_unique = None
 
+        summary_obj = self._distinct_count_summary(state)
+        if state.sketch is not None and total_value_count > 0:
+            summary_obj["confidence_interval"] = [
+                min(bound / total_value_count, 1.) for bound in summary_obj["confidence_interval"]
+            ]
+
         return {
             "success": (
                 ((min_value is None) or (min_value <= proportion_unique)) and
                 ((max_value is None) or (proportion_unique <= max_value))
             ),
             "true_value": proportion_unique,
-            "summary_obj": {}
+            "summary_obj": summary_obj
+        }
+
+    @staticmethod
+    def _distinct_count_summary(state):
+        if state.sketch is None:
+            return {}
+
+        return {
+            "approximate": True,
+            "relative_error": state.sketch.relative_error,
+            "confidence_interval": state.sketch.confidence_interval()
         }
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_chisquare_test_p_value_greater_than(self, column, partition_object=None, p=0.05):
+    @aggregate_state(ColumnDistributionState)
+    def expect_column_chisquare_test_p_value_greater_than(self, state, partition_object=None, p=0.05):
         if not is_valid_partition_object(partition_object):
             raise ValueError("Invalid partition object.")
+        if len(partition_object['partition']) != len(partition_object['weights']):
+            raise ValueError("The chi-squared test needs a categorical partition object.")
 
-        expected_column = pd.Series(partition_object['weights'], index=partition_object['partition'], name='expected') * len(column)
-        observed_frequencies = column.value_counts()
+        expected_column = pd.Series(partition_object['weights'], index=partition_object['partition'], name='expected') * state.count
+        observed_frequencies = state.finalize().rename('observed')
         # Join along the indicies to ensure we have values
         test_df = pd.concat([expected_column, observed_frequencies], axis = 1).fillna(0)
-        test_result = stats.chisquare(test_df[column.name], test_df['expected'])[1]
+        observed, expected = test_df['observed'].values, test_df['expected'].values
+
+        # Values outside a partition with an other_weight are tested as one more category
+        if "other_weight" in partition_object:
+            other_observed = state.other_count
+            other_expected = partition_object['other_weight'] * state.count
+            if other_observed > 0 or other_expected > 0:
+                observed = np.append(observed, other_observed)
+                expected = np.append(expected, other_expected)
+
+        test_result = stats.chisquare(observed, expected)[1]
 
         result_obj = {
                 "success": test_result > p,
@@ -548,21 +1018,17 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         return result_obj
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_bootstrapped_ks_test_p_value_greater_than(self, column, partition_object=None, p=0.05, bootstrap_samples=0):
+    def expect_column_bootstrapped_ks_test_p_value_greater_than(self, column, partition_object=None, p=0.05, bootstrap_samples=0,
+                                                                random_state=None, n_jobs=1):
         if not is_valid_partition_object(partition_object):
             raise ValueError("Invalid partition object.")
 
-        estimated_cdf = lambda x: np.interp(x, partition_object['partition'], np.append(np.array([0]), np.cumsum(partition_object['weights'])))
-
         if (bootstrap_samples == 0):
             #bootstrap_samples = min(1000, int (len(not_null_values) / len(partition_object['weights'])))
             bootstrap_samples = 1000
 
-        results = [ stats.kstest(
-                        np.random.choice(column, size=len(partition_object['weights']), replace=True),
-                        estimated_cdf)[1]
-                    for k in range(bootstrap_samples)
-                  ]
+        results = bootstrap_ks_test_p_values(column, partition_object, bootstrap_samples,
+                                             random_state=random_state, n_jobs=n_jobs)
 
         test_result = np.mean(results)
 
@@ -577,23 +1043,27 @@ class PandasDataSet(MetaPandasDataSet, pd.DataFrame):
         return result_obj
 
     @MetaPandasDataSet.column_aggregate_expectation
-    def expect_column_kl_divergence_less_than(self, column, partition_object=None, threshold=None):
+    @aggregate_state(ColumnDistributionState)
+    def expect_column_kl_divergence_less_than(self, state, partition_object=None, threshold=None):
         if not is_valid_partition_object(partition_object):
             raise ValueError("Invalid partition object.")
 
         if not (isinstance(threshold, float) and (threshold >= 0)):
             raise ValueError("Threshold must be specified, greater than or equal to zero.")
 
-        # If the data expected to be discrete, build a column
-        if (len(partition_object['weights']) == len(partition_object['partition'])):
-            observed_frequencies = column.value_counts()
-            pk = observed_frequencies / (1.* len(column))
-        else:
-            partition_object = remove_empty_intervals(partition_object)
-            hist, bin_edges = np.histogram(column, partition_object['partition'], density=False)
-            pk = hist / (1.* len(column))
+        # The state holds value counts if the data is expected to be discrete, and a histogram over the partition
+        # (with empty intervals removed) otherwise
+        if state.partition_object is not None:
+            partition_object = state.partition_object
+        pk = state.finalize() / (1.* state.count)
+        qk = partition_object['weights']
+
+        # Values outside a partition with an other_weight are one more category
+        if "other_weight" in partition_object:
+            pk = np.append(pk, state.other_count / (1. * state.count))
+            qk = np.append(qk, partition_object['other_weight'])
 
-        kl_divergence = stats.entropy(pk, partition_object['weights'])
+        kl_divergence = stats.entropy(pk, qk)
 
         result_obj = {
                 "success": kl_divergence <= threshold,
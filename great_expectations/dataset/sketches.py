@@ -0,0 +1,466 @@
+"""
+Mergeable summaries of column values that use bounded memory.
+
+Sketches are built from pandas Series one chunk at a time, merge with sketches of the same size built over other rows,
+and round-trip through to_dict/from_dict as plain json-serializable dicts.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values):
+    """Hash a Series of nonnull values to uint64.
+
+    Integral floats are hashed as integers so that the same value gets the same hash whether or not the chunk it came
+    from contained nulls (which upcast integer columns to float).
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == 'f' and len(values) > 0 and np.all(np.mod(values.values, 1) == 0) and \
+            np.all(np.abs(values.values) < 2 ** 63):
+        values = values.astype(np.int64)
+
+    return pd.util.hash_pandas_object(values, index=False).values.astype(np.uint64)
+
+
+def _bit_length(x):
+    """Number of significant bits of each element of a uint64 array."""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        has_high_bits = x >= np.uint64(1 << shift)
+        length[has_high_bits] += shift
+        x[has_high_bits] >>= np.uint64(shift)
+    length += (x > 0)
+    return length
+
+
+class HyperLogLog(object):
+    """HyperLogLog estimate of the number of distinct values (Flajolet et al., 2007).
+
+    The sketch holds 2**precision registers of one byte. The relative standard error of the estimate is
+    1.04 / sqrt(2**precision): about 1.6% for precision=12, 0.8% for 14 and 0.4% for 16. Values are hashed to 64 bits,
+    so no large range correction is needed; hash collisions only matter for billions of distinct values.
+
+    Args:
+        relative_error (float): the largest acceptable relative standard error. Used to pick the precision if that is
+            not given; errors below about 0.002, which would need a precision above 18, raise ValueError.
+        precision (int or None): the number of index bits, between 4 and 18.
+    """
+
+    min_precision = 4
+    max_precision = 18
+
+    def __init__(self, relative_error=0.01, precision=None):
+        if precision is None:
+            if not relative_error > 0:
+                raise ValueError("relative_error must be greater than zero.")
+            precision = max(int(math.ceil(math.log(max((1.04 / relative_error) ** 2, 1), 2))), self.min_precision)
+            if precision > self.max_precision:
+                raise ValueError("relative_error must be at least %g, the error of a sketch of precision %d." % (
+                    1.04 / math.sqrt(2 ** self.max_precision), self.max_precision))
+
+        if not self.min_precision <= precision <= self.max_precision:
+            raise ValueError("precision must be between %d and %d." % (self.min_precision, self.max_precision))
+
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """The relative standard error of the estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, values):
+        """Add a Series of nonnull values to the sketch."""
+        if len(values) == 0:
+            return self
+
+        hashes = hash_values(values)
+        remaining_bits = 64 - self.precision
+
+        index = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << remaining_bits) - 1)
+        # Position of the leftmost 1 in the remaining bits
+        rank = (remaining_bits - _bit_length(remainder) + 1).astype(np.uint8)
+
+        max_rank = pd.Series(rank).groupby(index).max()
+        self.registers[max_rank.index.values] = np.maximum(self.registers[max_rank.index.values], max_rank.values)
+        return self
+
+    def merge(self, other):
+        """Fold a sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+
+        self.registers = np.maximum(self.registers, other.registers)
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct values."""
+        m = float(len(self.registers))
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[int(m)]
+
+        estimate = alpha * m ** 2 / np.sum(np.power(2., -self.registers.astype(float)))
+
+        # Linear counting is more accurate while many registers are still empty
+        empty_registers = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and empty_registers > 0:
+            estimate = m * math.log(m / empty_registers)
+
+        return float(estimate)
+
+    def confidence_interval(self, standard_errors=2):
+        """Interval of +/- standard_errors relative standard errors around the estimate (about 95% for 2)."""
+        estimate = self.estimate()
+        margin = standard_errors * self.relative_error * estimate
+        return [max(estimate - margin, 0.), estimate + margin]
+
+    def to_dict(self):
+        return {
+            "precision": self.precision,
+            "registers": self.registers.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        sketch = cls(precision=sketch_dict["precision"])
+        sketch.registers = np.array(sketch_dict["registers"], dtype=np.uint8)
+        return sketch
+
+
+class MisraGries(object):
+    """Misra-Gries summary of the most frequent values (Misra and Gries, 1982), merged as in Agarwal et al. (2012).
+
+    The summary keeps at most k counters. Every value that makes up more than 1 / (k + 1) of the values is kept, and
+    each kept count is at most error_bound() below the true count.
+
+    Args:
+        k (int): the number of counters.
+    """
+
+    def __init__(self, k=100):
+        if k < 1:
+            raise ValueError("k must be at least one.")
+
+        self.k = k
+        self.count = 0
+        self.counts = pd.Series([], dtype=np.int64)
+
+    def update(self, values):
+        """Add a Series of nonnull values to the summary."""
+        value_counts = pd.Series(values).value_counts()
+        self.count += int(value_counts.sum())
+        self._add_counts(value_counts)
+        return self
+
+    def merge(self, other):
+        """Fold another summary into this one. The result keeps as many counters as this summary."""
+        self.count += other.count
+        self._add_counts(other.counts)
+        return self
+
+    def _add_counts(self, counts):
+        if len(self.counts) > 0:
+            counts = self.counts.add(counts, fill_value=0)
+        counts = counts.sort_values(ascending=False, kind='mergesort')
+
+        # Decrementing every counter by the (k+1)-th largest count leaves at most k positive counters
+        if len(counts) > self.k:
+            counts = counts.iloc[:self.k] - counts.iloc[self.k]
+            counts = counts[counts > 0]
+
+        self.counts = counts.astype(np.int64)
+
+    def error_bound(self):
+        """The largest amount by which a kept count can be below the true count."""
+        return (self.count - int(self.counts.sum())) / float(self.k + 1)
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "count": self.count,
+            "values": self.counts.index.tolist(),
+            "counts": self.counts.values.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        sketch = cls(k=sketch_dict["k"])
+        sketch.count = sketch_dict["count"]
+        sketch.counts = pd.Series(sketch_dict["counts"], index=sketch_dict["values"], dtype=np.int64)
+        return sketch
+
+
+class KLLSketch(object):
+    """KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Values are kept in a hierarchy of compactors. When a compactor exceeds its capacity it is sorted and every other
+    value, starting at a random offset, is promoted to the next level with twice the weight. The top compactor holds k
+    values and lower ones geometrically fewer, so the sketch keeps at most about 3k values whatever the number of rows.
+
+    The normalized rank error of a single quantile is about 2.3 / k**0.97 with 99% confidence: roughly 1.3% for the
+    default k=200, 0.7% for k=400 and 0.3% for k=1000 (rank error times the number of values is the distance, in rows,
+    between the estimate and the true quantile). The sketch is exact until the values no longer fit in level zero.
+
+    Args:
+        k (int): the size of the top compactor, which sets the accuracy and the memory footprint.
+        random_state (int or None): seed for the compaction offsets.
+    """
+
+    capacity_ratio = 2. / 3
+
+    def __init__(self, k=200, random_state=None):
+        if k < 8:
+            raise ValueError("k must be at least 8.")
+
+        self.k = k
+        self.count = 0
+        self.compactors = [np.array([], dtype=float)]
+        self._random = np.random.RandomState(random_state)
+
+    @property
+    def rank_error(self):
+        """Normalized rank error of a single quantile, with 99% confidence."""
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(math.ceil(self.k * self.capacity_ratio ** depth)), 2)
+
+    def update(self, values):
+        """Add a Series of nonnull numeric values to the sketch."""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold a sketch with the same k into this one."""
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches with different k.")
+
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.array([], dtype=float))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        # Adding a level lowers the capacity of the levels below it, so sweep until every level fits
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.compactors)):
+                if len(self.compactors[level]) > self._capacity(level):
+                    self._compact(level)
+                    compacted = True
+
+    def _compact(self, level):
+        if level + 1 == len(self.compactors):
+            self.compactors.append(np.array([], dtype=float))
+
+        items = np.sort(self.compactors[level])
+        # An odd item out stays at this level
+        if len(items) % 2 == 1:
+            self.compactors[level] = items[-1:]
+            items = items[:-1]
+        else:
+            self.compactors[level] = np.array([], dtype=float)
+
+        promoted = items[self._random.randint(2)::2]
+        self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+
+    def _weighted_items(self):
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=np.int64) for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='mergesort')
+        return items[order], weights[order]
+
+    def is_exact(self):
+        return len(self.compactors) == 1
+
+    def quantile(self, q):
+        """Estimated q-quantile, interpolated between order statistics like pandas.Series.quantile."""
+        if self.count == 0:
+            return np.nan
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+
+        items, weights = self._weighted_items()
+        if self.is_exact():
+            return float(np.percentile(items, 100 * q))
+
+        # Position of the quantile among the (weighted) order statistics
+        position = q * (self.count - 1)
+        cumulative = np.cumsum(weights) - 1
+        lower = items[min(np.searchsorted(cumulative, np.floor(position)), len(items) - 1)]
+        upper = items[min(np.searchsorted(cumulative, np.ceil(position)), len(items) - 1)]
+        return float(lower + (upper - lower) * (position - np.floor(position)))
+
+    def rank(self, value, inclusive=True):
+        """Estimated fraction of values less than or equal to value, or less than value if inclusive is False."""
+        if self.count == 0:
+            return np.nan
+
+        items, weights = self._weighted_items()
+        if inclusive:
+            return float(np.sum(weights[items <= value])) / np.sum(weights)
+        return float(np.sum(weights[items < value])) / np.sum(weights)
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "count": self.count,
+            "compactors": [items.tolist() for items in self.compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        sketch = cls(k=sketch_dict["k"])
+        sketch.count = sketch_dict["count"]
+        sketch.compactors = [np.array(items, dtype=float) for items in sketch_dict["compactors"]]
+        return sketch
+
+
+class PartitionBuilder(object):
+    """Build a continuous partition object, like util.partition_data, from chunks of data.
+
+    With fixed bin edges, or with bins='uniform' and a range, every value is counted in its bin and the weights are
+    exact: the same as np.histogram over all the data divided by the number of values (values outside the edges are in
+    no bin, so the weights then sum to less than one). With bins='ntile', the bin edges are quantiles estimated with a
+    KLL sketch of size k and the weights are the estimated fractions of values between them; the first and last edges
+    are the exact minimum and maximum. Null values are ignored.
+
+    Args:
+        bins (string or list): 'uniform', 'ntile', or a list of bin edges.
+        n_bins (int): the number of bins for 'uniform' and 'ntile'.
+        range (tuple or None): the (lower, upper) range of 'uniform' bins, which is required.
+        k (int): the size of the quantile sketch for 'ntile' bins.
+    """
+
+    def __init__(self, bins='ntile', n_bins=10, range=None, k=200):
+        self.n_bins = n_bins
+        self.range = None
+        self.k = k
+
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.bin_edges = None
+        self.hist = None
+        self.sketch = None
+
+        if isinstance(bins, (list, tuple, np.ndarray)):
+            self.bins = 'fixed'
+            self.bin_edges = np.asarray(bins, dtype=float)
+            self.hist = np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+        elif bins == 'uniform':
+            if range is None:
+                raise ValueError("Uniform bins need a range to count values in fixed bins.")
+            self.bins = 'uniform'
+            self.range = (range[0], range[1])
+            self.bin_edges = np.linspace(range[0], range[1], n_bins + 1)
+            self.hist = np.zeros(n_bins, dtype=np.int64)
+        elif bins == 'ntile':
+            self.bins = 'ntile'
+            self.sketch = KLLSketch(k=k, random_state=0)
+        else:
+            raise ValueError("Invalid parameter for bins argument")
+
+    def update(self, values):
+        """Add a chunk of numeric values to the partition."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = values.min() if self.min is None else min(self.min, values.min())
+        self.max = values.max() if self.max is None else max(self.max, values.max())
+
+        if self.bins == 'ntile':
+            self.sketch.update(values)
+        elif self.bins == 'uniform':
+            # Counted like partition_data counts uniform bins
+            self.hist += np.histogram(values, self.n_bins, range=self.range)[0]
+        else:
+            self.hist += np.histogram(values, self.bin_edges)[0]
+        return self
+
+    def merge(self, other):
+        """Fold a builder with the same bins, built over other data, into this one."""
+        if self.bins != other.bins or (self.bins == 'ntile' and self.n_bins != other.n_bins) or \
+                (self.bins != 'ntile' and not np.array_equal(self.bin_edges, other.bin_edges)):
+            raise ValueError("Cannot merge partition builders with different bins.")
+
+        if self.bins == 'ntile':
+            self.sketch.merge(other.sketch)
+        else:
+            self.hist += other.hist
+
+        self.count += other.count
+        if other.count > 0:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def partition_object(self):
+        """Return the partition object of all the values seen so far."""
+        if self.count == 0:
+            raise ValueError("Cannot build a partition from no data.")
+
+        if self.bins != 'ntile':
+            return {
+                "partition": self.bin_edges.copy(),
+                "weights": self.hist / (1. * self.count)
+            }
+
+        inner_edges = np.array([self.sketch.quantile(q) for q in np.linspace(0, 1, self.n_bins + 1)[1:-1]])
+        inner_edges = np.clip(inner_edges, self.min, self.max)
+        # Like np.histogram, bins include their left edge
+        cumulative_weights = np.array([self.sketch.rank(edge, inclusive=False) for edge in inner_edges])
+        return {
+            "partition": np.concatenate([[self.min], inner_edges, [self.max]]),
+            "weights": np.diff(np.concatenate([[0.], cumulative_weights, [1.]]))
+        }
+
+    def to_dict(self):
+        return {
+            "bins": self.bin_edges.tolist() if self.bins == 'fixed' else self.bins,
+            "n_bins": self.n_bins,
+            "range": None if self.range is None else list(self.range),
+            "k": self.k,
+            "count": self.count,
+            "min": None if self.min is None else float(self.min),
+            "max": None if self.max is None else float(self.max),
+            "hist": None if self.hist is None else self.hist.tolist(),
+            "sketch": None if self.sketch is None else self.sketch.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, builder_dict):
+        builder = cls(bins=builder_dict["bins"], n_bins=builder_dict["n_bins"], range=builder_dict["range"],
+                      k=builder_dict["k"])
+        builder.count = builder_dict["count"]
+        builder.min = builder_dict["min"]
+        builder.max = builder_dict["max"]
+        if builder_dict["hist"] is not None:
+            builder.hist = np.array(builder_dict["hist"], dtype=np.int64)
+        if builder_dict["sketch"] is not None:
+            builder.sketch = KLLSketch.from_dict(builder_dict["sketch"])
+        return builder
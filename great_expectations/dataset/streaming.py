@@ -0,0 +1,313 @@
+"""
+Chunk-by-chunk validation for data that does not fit in memory.
+
+A StreamingValidator holds one mergeable partial result per expectation in a config. Every chunk of rows updates the
+partial results, validators built over different shards of the same data can be merged, and finalize() returns the
+same {"results": [...]} object that DataSet.validate returns.
+"""
+
+import copy
+import traceback
+
+import pandas as pd
+
+from .pandas_dataset import PandasDataSet
+
+
+class StreamingValidator(object):
+
+    def __init__(self, expectations_config, dataset_class=PandasDataSet,
+                 catch_exceptions=True, output_format=None, include_config=None):
+        """
+        Args:
+            expectations_config (dict): the config to validate against.
+            dataset_class (class): the DataSet subclass that chunks are converted to.
+            catch_exceptions, output_format, include_config: as in DataSet.validate.
+        """
+        self.dataset_class = dataset_class
+        self.catch_exceptions = catch_exceptions
+        self.include_config = include_config
+
+        self.expectations = []
+        self.partials = []
+        for expectation in expectations_config['expectations']:
+            expectation = {
+                "expectation_type": expectation["expectation_type"],
+                "kwargs": copy.deepcopy(dict(expectation["kwargs"])),
+            }
+            if output_format is not None:
+                expectation['kwargs'].update({"output_format": output_format})
+            if include_config is not None:
+                expectation['kwargs'].update({"include_config": include_config})
+
+            self.expectations.append(expectation)
+            self.partials.append(_make_partial(dataset_class, expectation))
+
+        self.tracebacks = [None] * len(self.expectations)
+
+    def update(self, chunk):
+        """Add a chunk of rows (a pandas DataFrame) to every partial result."""
+        chunk.__class__ = self.dataset_class
+        chunk.initialize_expectations()
+
+        # Share one column scan per column between the expectations, as validate() does
+        chunk._column_scans = {}
+        for position, partial in enumerate(self.partials):
+            if self.tracebacks[position] is not None:
+                continue
+
+            try:
+                partial.update(chunk)
+            except Exception as err:
+                if self.catch_exceptions:
+                    self.tracebacks[position] = traceback.format_exc()
+                else:
+                    raise(err)
+        chunk._column_scans = None
+
+    def merge(self, other):
+        """Fold the partial results of another validator, built from the same config over other rows, into this one."""
+        for position, partial in enumerate(self.partials):
+            if self.tracebacks[position] is None:
+                self.tracebacks[position] = other.tracebacks[position]
+            if self.tracebacks[position] is None:
+                partial.merge(other.partials[position])
+
+    def finalize(self):
+        """Return the validation results for all the rows seen so far, in the format of DataSet.validate."""
+        formatter = self.dataset_class()
+
+        results = []
+        for position, expectation in enumerate(self.expectations):
+            kwargs = expectation['kwargs']
+            output_format = kwargs.get("output_format", formatter.default_expectation_args["output_format"])
+            include_config = kwargs.get("include_config", formatter.default_expectation_args["include_config"])
+
+            exception_traceback = self.tracebacks[position]
+            if exception_traceback is None:
+                try:
+                    return_obj = self.partials[position].finalize(formatter, output_format)
+                except Exception as err:
+                    if self.catch_exceptions:
+                        exception_traceback = traceback.format_exc()
+                    else:
+                        raise(err)
+
+            if exception_traceback is not None:
+                if output_format != "BOOLEAN_ONLY":
+                    return_obj = {
+                        "success": False
+                    }
+                else:
+                    return_obj = False
+
+            if output_format != 'BOOLEAN_ONLY':
+                if include_config:
+                    return_obj["expectation_type"] = expectation["expectation_type"]
+                    return_obj["expectation_kwargs"] = dict(
+                        (k, v) for k, v in kwargs.items() if k not in ["include_config", "catch_exceptions"]
+                    )
+
+                if self.catch_exceptions:
+                    return_obj["raised_exception"] = exception_traceback is not None
+                    return_obj["exception_traceback"] = exception_traceback
+
+            results.append(
+                dict(list(expectation.items()) + list(return_obj.items()))
+            )
+
+        return {
+            "results": results
+        }
+
+
+def _make_partial(dataset_class, expectation):
+    expectation_type = expectation['expectation_type']
+    expectation_method = getattr(dataset_class, expectation_type)
+    kwargs = dict(
+        (k, v) for k, v in expectation['kwargs'].items()
+        if k not in ["output_format", "include_config", "catch_exceptions"]
+    )
+
+    if expectation_type in _table_stubs:
+        return _TablePartial(dataset_class, expectation_type, kwargs)
+
+    elif expectation_type in ["expect_column_values_to_not_be_null", "expect_column_values_to_be_null"]:
+        # These expectations count nulls as elements, so their denominator is element_count
+        return _ColumnMapPartial(expectation_type, kwargs, expectation['kwargs'].get("output_format"), True)
+
+    elif getattr(expectation_method, "_expectation_kind", None) == "column_map":
+        # A function whose result for a row depends on other rows (see not_row_wise) can't be evaluated per chunk
+        if not getattr(expectation_method, "_row_wise", True):
+            return _UnsupportedPartial(expectation_type)
+
+        return _ColumnMapPartial(expectation_type, kwargs, expectation['kwargs'].get("output_format"), False)
+
+    elif getattr(expectation_method, "_aggregate_state", None) is not None:
+        return _ColumnAggregatePartial(expectation_method, kwargs)
+
+    else:
+        return _UnsupportedPartial(expectation_type)
+
+
+class _UnsupportedPartial(object):
+
+    def __init__(self, expectation_type):
+        self.expectation_type = expectation_type
+
+    def update(self, dataset):
+        raise NotImplementedError("%s cannot be evaluated chunk by chunk." % (self.expectation_type,))
+
+    def merge(self, other):
+        pass
+
+    def finalize(self, formatter, output_format):
+        raise NotImplementedError("%s cannot be evaluated chunk by chunk." % (self.expectation_type,))
+
+
+# Table-level expectations are finalized by running the expectation itself on a stub data set with the same columns
+# or the same number of rows as the stream.
+_table_stubs = {
+    "expect_column_to_exist": lambda dataset_class, partial: dataset_class(columns=partial.columns),
+    "expect_table_row_count_to_be_between": lambda dataset_class, partial: dataset_class(index=pd.RangeIndex(partial.row_count)),
+    "expect_table_row_count_to_equal": lambda dataset_class, partial: dataset_class(index=pd.RangeIndex(partial.row_count)),
+}
+
+
+class _TablePartial(object):
+
+    def __init__(self, dataset_class, expectation_type, kwargs):
+        self.dataset_class = dataset_class
+        self.expectation_type = expectation_type
+        self.kwargs = kwargs
+
+        self.row_count = 0
+        self.columns = None
+
+    def update(self, dataset):
+        self.row_count += dataset.shape[0]
+        if self.columns is None:
+            self.columns = list(dataset.columns)
+
+    def merge(self, other):
+        self.row_count += other.row_count
+        if self.columns is None:
+            self.columns = other.columns
+
+    def finalize(self, formatter, output_format):
+        stub = _table_stubs[self.expectation_type](self.dataset_class, self)
+        return getattr(stub, self.expectation_type)(
+            output_format=output_format, include_config=False, catch_exceptions=False, **self.kwargs
+        )
+
+
+class _ColumnMapPartial(object):
+    """Counts and exceptions of a column_map expectation. Only the first 20 exceptions are kept for BASIC output."""
+
+    def __init__(self, expectation_type, kwargs, output_format, count_nulls):
+        self.expectation_type = expectation_type
+        self.kwargs = kwargs
+        self.mostly = kwargs.get("mostly")
+        self.count_nulls = count_nulls
+
+        if output_format == "BOOLEAN_ONLY":
+            self.max_exceptions = 0
+        elif output_format in [None, "BASIC"]:
+            self.max_exceptions = 20
+        else:
+            self.max_exceptions = None
+
+        self.element_count = 0
+        self.missing_count = 0
+        self.exception_count = 0
+        self.exception_list = []
+        self.exception_index_list = []
+
+    def update(self, dataset):
+        if self.max_exceptions is None:
+            result = getattr(dataset, self.expectation_type)(
+                output_format="SUMMARY", include_config=False, catch_exceptions=False, **self.kwargs
+            )
+
+            self.element_count += result["summary_obj"]["element_count"]
+            self.missing_count += result["summary_obj"]["missing_count"]
+            self.exception_count += result["summary_obj"]["exception_count"]
+            self._add_exceptions(result["exception_list"], result["exception_index_list"])
+
+        else:
+            # BASIC only materializes the first 20 exceptions of the chunk. The final BASIC output has no index list.
+            result = getattr(dataset, self.expectation_type)(
+                output_format="BASIC", include_config=False, catch_exceptions=False, **self.kwargs
+            )
+            scan = dataset.get_column_scan(self.kwargs["column"])
+
+            self.element_count += scan.element_count
+            self.missing_count += scan.element_count - int(scan.nonnull_count)
+            self.exception_count += result["summary_obj"]["exception_count"]
+            self._add_exceptions(result["summary_obj"]["partial_exception_list"], [])
+
+    def merge(self, other):
+        self.element_count += other.element_count
+        self.missing_count += other.missing_count
+        self.exception_count += other.exception_count
+        self._add_exceptions(other.exception_list, other.exception_index_list)
+
+    def _add_exceptions(self, exception_list, exception_index_list):
+        if self.max_exceptions is not None:
+            room = max(self.max_exceptions - len(self.exception_list), 0)
+            exception_list = exception_list[:room]
+            exception_index_list = exception_index_list[:room]
+
+        self.exception_list.extend(exception_list)
+        self.exception_index_list.extend(exception_index_list)
+
+    def finalize(self, formatter, output_format):
+        nonnull_count = self.element_count - self.missing_count
+        if self.count_nulls:
+            denominator = self.element_count
+        else:
+            denominator = nonnull_count
+        success_count = denominator - self.exception_count
+
+        success, percent_success = formatter.calc_map_expectation_success(
+            success_count, denominator, self.exception_count, self.mostly
+        )
+
+        return formatter.format_column_map_output(
+            output_format, success,
+            self.element_count,
+            None, nonnull_count,
+            None, success_count,
+            self.exception_list, self.exception_index_list,
+            exception_count=self.exception_count
+        )
+
+
+class _ColumnAggregatePartial(object):
+    """Mergeable state of a column_aggregate expectation declared with an aggregate_state. The expectation's own
+    implementing function is applied to the merged state in finalize."""
+
+    def __init__(self, expectation_method, kwargs):
+        self.function = expectation_method._aggregate_function
+        self.column = kwargs["column"]
+        self.function_kwargs = dict((k, v) for k, v in kwargs.items() if k != "column")
+        self.state = expectation_method._aggregate_state(**self.function_kwargs)
+
+        self.element_count = 0
+        self.nonnull_count = 0
+
+    def update(self, dataset):
+        scan = dataset.get_column_scan(self.column)
+        self.element_count += scan.element_count
+        self.nonnull_count += scan.nonnull_count
+        self.state.update_column(dataset, self.column, scan)
+
+    def merge(self, other):
+        self.element_count += other.element_count
+        self.nonnull_count += other.nonnull_count
+        self.state.merge(other.state)
+
+    def finalize(self, formatter, output_format):
+        result_obj = self.function(formatter, self.state, **self.function_kwargs)
+        null_count = self.nonnull_count - self.element_count
+        return formatter.format_column_aggregate_output(output_format, result_obj, self.nonnull_count, null_count)
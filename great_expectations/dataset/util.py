@@ -1,9 +1,11 @@
 #!! This is a second copy of this file. Inelegant.
 
 import numpy as np
-from scipy import stats
+from scipy import signal, special, stats
 import pandas as pd
 
+from .sketches import MisraGries
+
 
 class DotDict(dict):
     """dot.notation access to dictionary attributes"""
@@ -47,39 +49,76 @@ def ensure_json_serializable(test_dict):
 
 def is_valid_partition_object(partition_object):
     """Convenience method for determing whether a given partition object is a valid weighted partition of the real number line.
+
+    A categorical partition object may also have an "other_weight": the weight of all the values that are not in its
+    partition.
     """
     if (partition_object is None) or ("partition" not in partition_object) or ("weights" not in partition_object):
         return False
+    other_weight = 0
+    if "other_weight" in partition_object:
+        other_weight = partition_object["other_weight"]
+        if (len(partition_object['partition']) != len(partition_object['weights'])) or not (other_weight >= 0):
+            return False
     if (len(partition_object['partition']) != (len(partition_object['weights']) + 1)):
         if (len(partition_object['partition']) != len(partition_object['weights'])):
             return False
     # TODO: Evaluate desired tolerance for weights
-    if (abs(np.sum(partition_object['weights']) - 1) > 1e-6):
+    if (abs(np.sum(partition_object['weights']) + other_weight - 1) > 1e-6):
         return False
     return True
 
 
-def categorical_partition_data(data):
+def categorical_partition_data(data, top_k=None, approximate=False):
     """Convenience method for creating weights from categorical data.
     Args:
         data (list-like): The data from which to construct the estimate.
+        top_k (int or None): If given, only keep the top_k most frequent values in the partition, and put the weight \
+            of all the other values in "other_weight". Null values are then left out.
+        approximate (bool): If True, find the most frequent values with a Misra-Gries summary of top_k counters \
+            instead of counting every value. The weights are then underestimated by at most \
+            (1 - sum of the weights) / (top_k + 1) each, and a value is only certain to be kept if its weight is more \
+            than 1 / (top_k + 1).
     Returns:
         dict:
             {
                 "partition": (list) The categorical values present in the data
                 "weights": (list) The weights of the values in the partition.
+                "other_weight": (float) The weight of the values that are not in the partition, if top_k is given.
             }
     """
-    s = pd.Series(data).value_counts()
+    if top_k is None:
+        s = pd.Series(data).value_counts()
+        return {
+            "partition": s.index,
+            "weights":  s.values / (1. * len(data))
+        }
+
+    if approximate:
+        sketch = MisraGries(k=top_k).update(pd.Series(data))
+        s, count = sketch.counts, sketch.count
+    else:
+        s = pd.Series(data).value_counts()
+        count = s.sum()
+        s = s.iloc[:top_k]
+
+    weights = s.values / (1. * count)
     return {
         "partition": s.index,
-        "weights":  s.values / (1. * len(data))
+        "weights": weights,
+        "other_weight": max(1 - float(np.sum(weights)), 0.)
     }
 
-def kde_smooth_data(data):
+def kde_smooth_data(data, approximate=False, grid_size=4096, max_samples=None, random_state=None):
     """Convenience method for building a partition and weights using a gaussian Kernel Density Estimate and default bandwidth.
     Args:
         data (list-like): The data from which to construct the estimate.
+        approximate (bool): If True, bin the data onto a regular grid and compute the CDF of the estimate with one FFT \
+            convolution, in O(n + grid_size * log(grid_size)) time instead of O(n * number of bins). The weights then \
+            differ from the exact ones by about 1e-6 for the default grid_size.
+        grid_size (int): The number of grid points the data is binned onto if approximate is True.
+        max_samples (int or None): If the data has more values, fit the estimate to a random sample of max_samples of them.
+        random_state (int or None): Seed for the sample.
     Returns:
         dict:
             {
@@ -87,13 +126,20 @@ def kde_smooth_data(data):
                 "weights": (list) The densities of the bins implied by the partition.
             }
     """
+    data = np.asarray(data, dtype=float)
+    if max_samples is not None and len(data) > max_samples:
+        data = np.random.RandomState(random_state).choice(data, size=max_samples, replace=False)
+
     kde = stats.kde.gaussian_kde(data)
     evaluation_partition = np.linspace(start = np.min(data) - (kde.covariance_factor() / 2),
                             stop = np.max(data) + (kde.covariance_factor() / 2),
                             num = np.floor(((np.max(data) - np.min(data)) / kde.covariance_factor()) + 1 ).astype(int))
-    cdf_vals = [kde.integrate_box_1d(-np.inf, x) for x in evaluation_partition]
+    kernel_stdev = np.sqrt(kde.covariance[0, 0])
+    if approximate:
+        cdf_vals = _binned_kde_cdf(data, kernel_stdev, evaluation_partition, grid_size)
+    else:
+        cdf_vals = _kde_cdf(data, kernel_stdev, evaluation_partition)
     evaluation_weights = np.diff(cdf_vals)
-    #evaluation_weights = [cdf_vals[k+1] - cdf_vals[k] for k in range(len(evaluation_partition)-1)]
 
     # We need to account for weight outside the explicit partition at this point since we have smoothed.
     # Following is basically a crude rule of thumb for what should be -inf and inf as real endpoints.
@@ -106,6 +152,38 @@ def kde_smooth_data(data):
         "weights": weights
     }
 
+def _kde_cdf(data, kernel_stdev, points):
+    """CDF at points of a gaussian KDE of data, as gaussian_kde.integrate_box_1d(-inf, point) computes it, evaluated
+    for blocks of points at once."""
+    cdf_vals = np.empty(len(points))
+    block_size = max(1, 2 ** 22 // len(data))
+    for start in range(0, len(points), block_size):
+        block = points[start:start + block_size]
+        cdf_vals[start:start + block_size] = np.mean(
+            special.ndtr((block[:, np.newaxis] - data[np.newaxis, :]) / kernel_stdev), axis=1)
+    return cdf_vals
+
+def _binned_kde_cdf(data, kernel_stdev, points, grid_size):
+    """CDF at points of a gaussian KDE of data, computed from data linearly binned onto a regular grid."""
+    low = min(np.min(data), np.min(points))
+    high = max(np.max(data), np.max(points))
+    grid, step = np.linspace(low, high, grid_size, retstep=True)
+
+    # Each value is split between its two neighbouring grid points
+    position = (data - low) / step
+    left = np.clip(np.floor(position).astype(int), 0, grid_size - 2)
+    right_share = position - left
+    counts = np.bincount(left, weights=1 - right_share, minlength=grid_size) + \
+        np.bincount(left + 1, weights=right_share, minlength=grid_size)
+
+    # The CDF on the grid is the convolution of the counts with the normal CDF at every grid offset
+    kernel = special.ndtr(np.arange(-(grid_size - 1), grid_size) * step / kernel_stdev)
+    grid_cdf = signal.fftconvolve(counts, kernel)[grid_size - 1:2 * grid_size - 1] / len(data)
+    # FFT rounding could otherwise make the CDF decrease slightly
+    grid_cdf = np.maximum.accumulate(np.clip(grid_cdf, 0, 1))
+
+    return np.interp(points, grid, grid_cdf)
+
 def partition_data(data, bins='auto', n_bins=10):
     """Convenience method for building a partition and weights using simple options.
     Args:
@@ -119,14 +197,21 @@ def partition_data(data, bins='auto', n_bins=10):
                 "weights": (list) The densities of the bins implied by the partition.
             }
     """
+    data = np.asarray(data)
+    hist_range = None
     if bins == 'uniform':
-        bins = np.linspace(start=np.min(data), stop=np.max(data), num = n_bins+1)
+        data_min, data_max = np.min(data), np.max(data)
+        if data_max > data_min:
+            # Equal-width bins given as a count and a range are counted in one pass instead of by binary search
+            bins, hist_range = n_bins, (data_min, data_max)
+        else:
+            bins = np.linspace(start=data_min, stop=data_max, num = n_bins+1)
     elif bins =='ntile':
         bins = np.percentile(data, np.linspace(start=0, stop=100, num = n_bins+1))
     elif bins != 'auto':
         raise ValueError("Invalid parameter for bins argument")
 
-    hist, bin_edges = np.histogram(data, bins, density=False)
+    hist, bin_edges = np.histogram(data, bins, range=hist_range, density=False)
 
     #TODO: Evaluate numpy deprecation of np.histogram's normed option to ensure we're okay with the numerical issues here.
     # Probably we're having bigger problems through serialization.
@@ -138,17 +223,29 @@ def partition_data(data, bins='auto', n_bins=10):
     }
 
 def remove_empty_intervals(partition_object):
-    partition_object['weights'] = np.array(partition_object['weights'])
-    partition_object['partition'] = np.array(partition_object['partition'])
-    for k in range(len(partition_object['weights'])):
-        if (partition_object['weights'][k] == 0):
-
-            #del(partition_object['weights'][k])
-            partition_object['weights'] = np.delete(partition_object['weights'],k)
-            if ( (k + 1) < len(partition_object['weights'])):
-                interval = partition_object['partition'][k+1] - partition_object['partition'][k]
-                partition_object['partition'][k+1] = partition_object['partition'][k+1] - (interval / 2)
-            #del(partition_object['partition'][k])
-            partition_object['partition'] =np.delete(partition_object['partition'],k)
-            return remove_empty_intervals(partition_object)
+    """Remove the zero-weight intervals of a continuous partition object, in place.
+
+    Empty intervals are removed from left to right. The left endpoint of an empty interval is dropped and, except in the
+    last two intervals, its right endpoint is moved to the middle of the interval, so that the neighbouring intervals
+    share it.
+
+    Args:
+        partition_object (dict): A continuous partition object.
+    Returns:
+        dict: The same partition object, with numpy array partition and weights.
+    """
+    weights = np.array(partition_object['weights'])
+    partition = np.array(partition_object['partition'])
+
+    empty = np.flatnonzero(weights == 0)
+    # Runs of empty intervals move the same endpoint repeatedly, so this loop over the empty intervals has to be sequential
+    for k in empty[empty < len(weights) - 2]:
+        interval = partition[k + 1] - partition[k]
+        partition[k + 1] = partition[k + 1] - (interval / 2)
+
+    kept_endpoints = np.ones(len(partition), dtype=bool)
+    kept_endpoints[empty] = False
+
+    partition_object['weights'] = weights[weights != 0]
+    partition_object['partition'] = partition[kept_endpoints]
     return partition_object
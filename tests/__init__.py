@@ -4,3 +4,6 @@ from .test_dataset import *
 from .test_pandas_dataset import *
 from .test_pandas_dataset_distributional_expectations import *
 from .test_expectation_decorators import *
+from .test_streaming import *
+from .test_aggregate_states import *
+from .test_sketches import *
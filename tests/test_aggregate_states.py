@@ -0,0 +1,107 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import great_expectations as ge
+from great_expectations.dataset import MetaPandasDataSet, PandasDataSet
+from great_expectations.dataset.aggregate_states import (
+    aggregate_state, ColumnAggregateState, ColumnMeanState, ColumnStdevState, ColumnValueCountsState,
+    ColumnDistributionState
+)
+
+
+class TestAggregateStates(unittest.TestCase):
+
+    def test_merged_states_match_single_pass(self):
+        np.random.seed(42)
+        values = pd.Series(np.random.normal(10, 3, 1000))
+        discrete_values = pd.Series(np.random.choice(["a", "b", "c", "d"], 1000))
+        partition_object = {"partition": [0, 5, 10, 15, 20], "weights": [0.1, 0.4, 0.4, 0.1]}
+
+        cases = [
+            (ColumnMeanState, values, {}, values.mean()),
+            (ColumnStdevState, values, {}, values.std()),
+            (ColumnValueCountsState, discrete_values, {}, discrete_values.value_counts()),
+            (ColumnDistributionState, values, {"partition_object": partition_object},
+                np.histogram(values, partition_object["partition"])[0]),
+        ]
+
+        for state_class, column, kwargs, expected in cases:
+            single = state_class(**kwargs).update(column)
+
+            merged = state_class(**kwargs)
+            for chunk in np.array_split(np.arange(len(column)), 7):
+                merged.merge(state_class(**kwargs).update(column.iloc[chunk]))
+
+            self.assertEqual(single.count, len(column))
+            self.assertEqual(merged.count, len(column))
+            if isinstance(expected, pd.Series):
+                pd.testing.assert_series_equal(single.finalize(), expected)
+                pd.testing.assert_series_equal(
+                    merged.finalize().astype(int).sort_index(), expected.sort_index(), check_names=False
+                )
+            else:
+                np.testing.assert_allclose(single.finalize(), expected)
+                np.testing.assert_allclose(merged.finalize(), expected)
+
+    def test_custom_state_expectation(self):
+
+        class ColumnMaxState(ColumnAggregateState):
+
+            def __init__(self, **kwargs):
+                super(ColumnMaxState, self).__init__(**kwargs)
+                self.max = None
+
+            def update(self, values):
+                super(ColumnMaxState, self).update(values)
+                if len(values) > 0 and (self.max is None or values.max() > self.max):
+                    self.max = values.max()
+                return self
+
+            def merge(self, other):
+                super(ColumnMaxState, self).merge(other)
+                if other.max is not None and (self.max is None or other.max > self.max):
+                    self.max = other.max
+                return self
+
+            def finalize(self):
+                return self.max
+
+        class CustomPandasDataSet(PandasDataSet):
+
+            @MetaPandasDataSet.column_aggregate_expectation
+            @aggregate_state(ColumnMaxState)
+            def expect_column_max_to_be_less_than(self, state, value):
+                return {
+                    "success": state.finalize() < value,
+                    "true_value": state.finalize(),
+                    "summary_obj": {}
+                }
+
+        df = ge.dataset.PandasDataSet({"x": [1, 5, None, 3]})
+        df.__class__ = CustomPandasDataSet
+        df.initialize_expectations()
+
+        self.assertEqual(
+            df.expect_column_max_to_be_less_than("x", 10),
+            {"success": True, "true_value": 5}
+        )
+        self.assertEqual(
+            df.expect_column_max_to_be_less_than("x", value=4),
+            {"success": False, "true_value": 5}
+        )
+        self.assertEqual(df.get_expectations_config()["expectations"][-1]["kwargs"]["value"], 4)
+
+        config = {"dataset_name": None, "meta": {}, "expectations": [
+            {"expectation_type": "expect_column_max_to_be_less_than", "kwargs": {"column": "Age", "value": 100}}
+        ]}
+        results = ge.validate_csv(
+            "./tests/examples/Titanic.csv", config, chunksize=200, dataset_class=CustomPandasDataSet
+        )
+        self.assertEqual(results["results"][0]["true_value"], 71)
+        self.assertTrue(results["results"][0]["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -85,5 +85,107 @@ class TestDataset(unittest.TestCase):
             }
         )
 
+    def test_compile_validation_plan(self):
+        df = ge.dataset.PandasDataSet({
+            'x' : [1,2,4],
+            'y' : [1,2,5],
+        })
+        df.expect_column_values_to_be_between('x', 0, 5)
+        df.expect_table_row_count_to_equal(3)
+
+        plan = df.compile_validation_plan(df.get_expectations_config()['expectations'])
+        self.assertEqual(list(plan.keys()), ['x', 'y', None])
+        self.assertEqual(plan['x'], [0, 2])
+        self.assertEqual(plan['y'], [1])
+        self.assertEqual(plan[None], [3])
+
+    def test_append_expectation_replaces_and_moves_to_end(self):
+        df = ge.dataset.PandasDataSet({
+            'x' : [1,2,4],
+            'y' : [1,2,5],
+        })
+        df.expect_table_row_count_to_equal(3)
+        df.expect_column_values_to_be_between('x', 0, 5)
+        df.expect_column_to_exist('x')
+        df.expect_column_values_to_be_between('x', 0, 10)
+
+        self.assertEqual(
+            df.get_expectations_config()['expectations'],
+            [
+                {"expectation_type": "expect_column_to_exist", "kwargs": {"column": "y"}},
+                {"expectation_type": "expect_table_row_count_to_equal", "kwargs": {"value": 3}},
+                {"expectation_type": "expect_column_to_exist", "kwargs": {"column": "x"}},
+                {"expectation_type": "expect_column_values_to_be_between",
+                    "kwargs": {"column": "x", "min_value": 0, "max_value": 10, "output_format": "BASIC"}},
+            ]
+        )
+
+        # The index is rebuilt from a loaded config
+        df_2 = ge.dataset.PandasDataSet({'x' : [1,2,4], 'y' : [1,2,5]})
+        df_2.initialize_expectations(json.loads(json.dumps(df.get_expectations_config())))
+        df_2.expect_column_to_exist('y')
+        self.assertEqual(
+            [exp['kwargs'].get('column') for exp in df_2.get_expectations_config()['expectations']],
+            [None, 'x', 'x', 'y']
+        )
+
+    def test_loaded_config_keeps_duplicate_keys(self):
+        config = {
+            "dataset_name": None,
+            "expectations": [
+                {"expectation_type": "expect_column_values_to_match_regex", "kwargs": {"column": "x", "regex": "^a"}},
+                {"expectation_type": "expect_column_to_exist", "kwargs": {"column": "x"}},
+                {"expectation_type": "expect_column_values_to_match_regex", "kwargs": {"column": "x", "regex": "b$"}},
+            ]
+        }
+        df = ge.dataset.PandasDataSet({'x': ['ab', 'ac', 'db']})
+        df.initialize_expectations(config)
+        self.assertEqual(df.get_expectations_config()['expectations'], config['expectations'])
+
+        # Both regexes run, in config order
+        results = df.validate(output_format="SUMMARY")["results"]
+        self.assertEqual(
+            [(result["kwargs"].get("regex"), result["summary_obj"]["exception_count"]) for result in results
+             if result["expectation_type"] == "expect_column_values_to_match_regex"],
+            [("^a", 1), ("b$", 1)]
+        )
+        self.assertEqual(len(results), 3)
+
+        # Appending replaces every expectation with the same key
+        df.expect_column_values_to_match_regex('x', 'c')
+        self.assertEqual(
+            [exp['kwargs'].get('regex') for exp in df.get_expectations_config()['expectations']],
+            [None, 'c']
+        )
+
+    def test_validate_shares_column_scans(self):
+        seen = []
+
+        class RecordingDataSet(ge.dataset.PandasDataSet):
+
+            @ge.dataset.MetaPandasDataSet.column_map_expectation
+            def expect_column_values_to_be_recorded(self, column):
+                seen.append(column)
+                return column.map(lambda x: True)
+
+            @ge.dataset.MetaPandasDataSet.column_map_expectation
+            def expect_column_values_to_be_recorded_again(self, column):
+                seen.append(column)
+                return column.map(lambda x: True)
+
+        df = RecordingDataSet({
+            'x' : [1,2,None],
+        })
+        df.expect_column_values_to_be_recorded('x')
+        df.expect_column_values_to_be_recorded_again('x')
+        self.assertIsNot(seen[0], seen[1])
+
+        del seen[:]
+        results = df.validate()
+        self.assertTrue(all([result['success'] for result in results['results']]))
+        self.assertEqual(len(seen), 2)
+        self.assertIs(seen[0], seen[1])
+        self.assertIsNone(df._column_scans)
+
 if __name__ == "__main__":
     unittest.main()
@@ -10,10 +10,12 @@
 import sys
 import unittest
 import great_expectations as ge
+import pandas as pd
 #reload(ge)
 # from great_expectations.dataset import PandasDataSet
 PandasDataSet = ge.dataset.PandasDataSet
 MetaPandasDataSet = ge.dataset.MetaPandasDataSet
+from great_expectations.dataset.pandas_dataset import not_row_wise
 
 # from ge.decorators import expectation, column_map_expectation, column_aggregate_expectation
 
@@ -329,5 +331,91 @@ class TestExpectationDecorators(unittest.TestCase):
         # with self.assertRaises(ZeroDivisionError):
         #     df.expectation_that_crashes_on_sixes("all_even", catch_exceptions=False)
 
+    def test_column_map_expectation_short_circuit(self):
+
+        evaluated = []
+
+        class CustomPandasDataSet(PandasDataSet):
+
+            @PandasDataSet.column_map_expectation
+            def expect_column_values_to_be_less_than(self, column, value):
+                evaluated.append(len(column))
+                return column < value
+
+            @PandasDataSet.column_map_expectation
+            @not_row_wise
+            def expect_column_values_to_be_less_than_ten_times_the_min(self, column):
+                evaluated.append(len(column))
+                return column < 10 * column.min()
+
+        df = CustomPandasDataSet({'x': list(range(1, 100001))})
+
+        for value, mostly in [(10, None), (100001, None), (50000, 0.4), (50000, 0.6), (99000, 0.99)]:
+            expected = df.expect_column_values_to_be_less_than('x', value, mostly=mostly, output_format="SUMMARY")
+            del evaluated[:]
+
+            result = df.expect_column_values_to_be_less_than('x', value, mostly=mostly, output_format="BOOLEAN_ONLY")
+            self.assertEqual(result, expected["success"])
+            if result:
+                self.assertGreater(len(evaluated), 1)
+                self.assertEqual(sum(evaluated), 100000)
+
+        # The first chunk decides a strict expectation that fails on the first rows
+        del evaluated[:]
+        df.expect_column_values_to_be_less_than('x', 10, output_format="BOOLEAN_ONLY")
+        self.assertEqual(evaluated, [1000])
+
+        # With mostly, evaluation stops once too few rows are left to reach it
+        del evaluated[:]
+        self.assertFalse(df.expect_column_values_to_be_less_than('x', 50000, mostly=0.9, output_format="BOOLEAN_ONLY"))
+        self.assertLess(sum(evaluated), 100000)
+
+        del evaluated[:]
+        self.assertFalse(df.expect_column_values_to_be_less_than_ten_times_the_min('x', output_format="BOOLEAN_ONLY"))
+        self.assertEqual(evaluated, [100000])
+
+    def test_column_map_expectation_distinct_values(self):
+
+        evaluated = []
+
+        class CustomPandasDataSet(PandasDataSet):
+
+            @PandasDataSet.column_map_expectation
+            def expect_column_values_to_be_lowercase(self, column):
+                evaluated.append(len(column))
+                return column.map(lambda x: x == x.lower())
+
+            @PandasDataSet.column_map_expectation
+            @not_row_wise
+            def expect_column_values_to_be_in_the_first_half(self, column):
+                evaluated.append(len(column))
+                return pd.Series(column.index < len(column) // 2, index=column.index)
+
+        values = ['a', 'b', 'C', None, 'd'] * 1000
+        df = CustomPandasDataSet({
+            'x': values,
+            'x_categorical': pd.Categorical(values),
+            'y': [str(i) for i in range(5000)],
+        })
+
+        # The function is evaluated once per distinct value, with the same results as row by row
+        for column in ['x', 'x_categorical']:
+            del evaluated[:]
+            result = df.expect_column_values_to_be_lowercase(column, output_format="SUMMARY")
+            self.assertEqual(evaluated, [4])
+            self.assertEqual(result["summary_obj"]["exception_count"], 1000)
+            self.assertEqual(result["exception_list"], ['C'] * 1000)
+            self.assertEqual(result["exception_index_list"], list(range(2, 5000, 5)))
+
+        # Columns with mostly distinct values are evaluated row by row
+        del evaluated[:]
+        self.assertTrue(df.expect_column_values_to_be_lowercase('y', output_format="BOOLEAN_ONLY"))
+        self.assertEqual(sum(evaluated), 5000)
+
+        del evaluated[:]
+        df.expect_column_values_to_be_in_the_first_half('x', output_format="BOOLEAN_ONLY")
+        self.assertEqual(evaluated, [4000])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import json
 import os
 import random
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -149,6 +151,158 @@ class TestValidation(unittest.TestCase):
                             expected_results
                             )
 
+    def test_validate_parallel(self):
+
+        with open("./tests/examples/titanic_expectations.json") as f:
+            my_expectations_config = json.load(f)
+
+        my_df = ge.read_csv(
+            "./tests/examples/Titanic.csv",
+            expectations_config=my_expectations_config
+        )
+        my_df.set_default_expectation_argument("output_format", "COMPLETE")
+
+        # The first run stores output_format in each expectation's kwargs
+        my_df.validate()
+        expected_results = my_df.validate()
+        expected_config = json.dumps(my_df.get_expectations_config())
+
+        for executor in ["thread", "process"]:
+            results = my_df.validate(n_jobs=2, executor=executor)
+            self.assertEqual(results, expected_results)
+            self.assertEqual(json.dumps(my_df.get_expectations_config()), expected_config)
+
+        # Bad arguments are rejected before any expectation runs
+        my_df.expect_table_row_count_to_be_between(0, 10)
+        expected_config = json.dumps(my_df.get_expectations_config())
+        for n_jobs in [1, 2]:
+            with self.assertRaises(ValueError):
+                my_df.validate(n_jobs=n_jobs, executor="cluster")
+            self.assertEqual(json.dumps(my_df.get_expectations_config()), expected_config)
+        with self.assertRaises(ValueError):
+            my_df.validate(n_jobs=0)
+
+
+class TestReadCsv(unittest.TestCase):
+
+    def setUp(self):
+        with open("./tests/examples/titanic_expectations.json") as f:
+            self.config = json.load(f)
+
+        self.config["expectations"] += [
+            {"expectation_type": "expect_table_row_count_to_equal", "kwargs": {"value": 1313}},
+            {"expectation_type": "expect_column_values_to_be_of_type", "kwargs": {"column": "PClass", "type_": "string", "target_datasource": "python"}},
+            {"expectation_type": "expect_column_values_to_be_in_set", "kwargs": {"column": "Survived", "value_set": ["0", "1"]}},
+        ]
+
+    def test_validation_only(self):
+        df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config)
+        pruned_df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config, validation_only=True)
+
+        # "Unnamed: 0" is not referenced, and Survived holds numbers, so it keeps its inferred dtype
+        self.assertEqual(list(pruned_df.columns), ["Name", "PClass", "Age", "Sex", "Survived", "SexCode"])
+        self.assertEqual(str(pruned_df["PClass"].dtype), "category")
+        self.assertEqual(pruned_df["Survived"].dtype, df["Survived"].dtype)
+
+        for output_format in ["COMPLETE", "SUMMARY"]:
+            self.assertEqual(
+                pruned_df.validate(output_format=output_format),
+                df.validate(output_format=output_format)
+            )
+
+    def test_validation_only_keeps_columns_for_table_expectations(self):
+        self.config["expectations"].append({"expectation_type": "expect_table_columns_to_be_sorted", "kwargs": {}})
+        df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config, validation_only=True)
+        self.assertEqual(len(df.columns), 7)
+
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestColumnarReaders(unittest.TestCase):
+
+    def setUp(self):
+        with open("./tests/examples/titanic_expectations.json") as f:
+            self.config = json.load(f)
+
+    @unittest.skipIf(pyarrow is None, "requires pyarrow")
+    def test_read_parquet_and_feather(self):
+        import pyarrow.feather
+        import pyarrow.parquet
+
+        df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config)
+        expected_results = df.validate(output_format="COMPLETE")
+
+        pruned_config = dict(self.config, expectations=[
+            e for e in self.config["expectations"] if e["kwargs"].get("column") in ["Age", "Name"]
+        ])
+
+        directory = tempfile.mkdtemp()
+        try:
+            parquet_file = os.path.join(directory, "Titanic.parquet")
+            pyarrow.parquet.write_table(pyarrow.Table.from_pandas(df, preserve_index=False), parquet_file)
+            feather_file = os.path.join(directory, "Titanic.feather")
+            pyarrow.feather.write_feather(df, feather_file)
+
+            for reader, filename in [(ge.read_parquet, parquet_file), (ge.read_feather, feather_file)]:
+                for memory_map in [True, False]:
+                    columnar_df = reader(filename, expectations_config=self.config, memory_map=memory_map)
+                    self.assertTrue(isinstance(columnar_df, PandasDataSet))
+                    self.assertEqual(list(columnar_df.columns), list(df.columns))
+                    self.assertEqual(columnar_df.validate(output_format="COMPLETE"), expected_results)
+
+                self.assertEqual(list(reader(filename, columns=["Age", "Sex"]).columns), ["Age", "Sex"])
+                pruned_df = reader(filename, expectations_config=pruned_config, validation_only=True)
+                self.assertEqual(list(pruned_df.columns), ["Name", "Age"])
+        finally:
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(pyarrow is None, "requires pyarrow")
+    def test_readers_close_files(self):
+        import pyarrow.feather
+        import pyarrow.parquet
+
+        df = ge.read_csv("./tests/examples/Titanic.csv")
+
+        # Record the files the readers open
+        opened = []
+        memory_map, os_file = pyarrow.memory_map, pyarrow.OSFile
+
+        def recording(open_file):
+            def open_and_record(*args, **kwargs):
+                opened.append(open_file(*args, **kwargs))
+                return opened[-1]
+            return open_and_record
+
+        directory = tempfile.mkdtemp()
+        pyarrow.memory_map, pyarrow.OSFile = recording(memory_map), recording(os_file)
+        try:
+            parquet_file = os.path.join(directory, "Titanic.parquet")
+            pyarrow.parquet.write_table(pyarrow.Table.from_pandas(df, preserve_index=False), parquet_file)
+            feather_file = os.path.join(directory, "Titanic.feather")
+            pyarrow.feather.write_feather(df, feather_file)
+            del opened[:]
+
+            for reader, filename in [(ge.read_parquet, parquet_file), (ge.read_feather, feather_file)]:
+                for use_memory_map in [True, False]:
+                    reader(filename, expectations_config=self.config, validation_only=True, memory_map=use_memory_map)
+
+            # One file per call, closed once the DataSet is built
+            self.assertEqual(len(opened), 4)
+            self.assertTrue(all(f.closed for f in opened))
+        finally:
+            pyarrow.memory_map, pyarrow.OSFile = memory_map, os_file
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_missing_pyarrow(self):
+        for reader in [ge.read_parquet, ge.read_feather]:
+            with self.assertRaises(ImportError):
+                reader("./tests/examples/Titanic.parquet")
+
 
 class TestRepeatedAppendExpectation(unittest.TestCase):
     def test_validate(self):
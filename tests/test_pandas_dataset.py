@@ -3,6 +3,7 @@ import json
 import hashlib
 import datetime
 import numpy as np
+import pandas as pd
 
 import great_expectations as ge
 
@@ -164,6 +165,9 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_values_to_be_unique(**t['in'])
             self.assertEqual(out, t['out'])
 
+            out = D.expect_column_values_to_be_unique(approximate=True, **t['in'])
+            self.assertEqual(out, t['out'])
+
 
         df = ge.dataset.PandasDataSet({
             'a' : ['2', '2', '2', '2'],
@@ -438,6 +442,37 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_values_to_be_of_type(**t['in'])
             self.assertEqual(out, t['out'])
 
+        D['c'] = pd.Series(['a', 'b', 'a']).astype('category')
+
+        T = [
+                {
+                    'in':{"column":"s","type_":"string","target_datasource":"python"},
+                    'out':{'success':False, 'exception_list':[1], 'exception_index_list':[2]}},
+                {
+                    'in':{"column":"c","type_":"string","target_datasource":"python"},
+                    'out':{'success':True, 'exception_list':[], 'exception_index_list':[]}},
+        ]
+
+        for t in T:
+            out = D.expect_column_values_to_be_of_type(**t['in'])
+            self.assertEqual(out, t['out'])
+
+        T = [
+                {
+                    'in':{"column":"s1","type_":["string","int"],"target_datasource":"python"},
+                    'out':{'success':False, 'exception_list':[2.0], 'exception_index_list':[1]}},
+                {
+                    'in':{"column":"y","type_":["int","double"],"target_datasource":"python"},
+                    'out':{'success':True, 'exception_list':[], 'exception_index_list':[]}},
+                {
+                    'in':{"column":"x","type_":["int","string"],"target_datasource":"numpy"},
+                    'out':{'success':False, 'exception_list':[1,2,4], 'exception_index_list':[0,1,2]}},
+        ]
+
+        for t in T:
+            out = D.expect_column_values_to_be_in_type_list(**t['in'])
+            self.assertEqual(out, t['out'])
+
 
     def test_expect_column_values_to_be_in_set(self):
         """
@@ -506,6 +541,33 @@ class TestPandasDataset(unittest.TestCase):
             out = D2.expect_column_values_to_be_in_set(**t['in'])
             self.assertEqual(out, t['out'])
 
+        # Categorical, numeric and mixed-type columns take vectorized paths that must agree with `x in value_set`
+        D3 = ge.dataset.PandasDataSet({
+            'cat' : pd.Series(['a','b','c','a',None]).astype('category'),
+            'num' : [1.5,2,3,4,None],
+            'mixed' : ['a',1,2.0,True,None],
+        })
+        D3.set_default_expectation_argument("output_format", "COMPLETE")
+
+        T = [
+                {
+                    'in':{'column':'cat', 'value_set':['a','c']},
+                    'out':{'success':False, 'exception_index_list':[1], 'exception_list':['b']}},
+                {
+                    'in':{'column':'num', 'value_set':list(range(1000))},
+                    'out':{'success':False, 'exception_index_list':[0], 'exception_list':[1.5]}},
+                {
+                    'in':{'column':'num', 'value_set':[]},
+                    'out':{'success':False, 'exception_index_list':[0,1,2,3], 'exception_list':[1.5,2,3,4]}},
+                {
+                    'in':{'column':'mixed', 'value_set':[1,2]},
+                    'out':{'success':False, 'exception_index_list':[0], 'exception_list':['a']}},
+        ]
+
+        for t in T:
+            out = D3.expect_column_values_to_be_in_set(**t['in'])
+            self.assertEqual(out, t['out'])
+
 
     def test_expect_column_values_to_not_be_in_set(self):
         """
@@ -582,6 +644,36 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_values_to_be_between(**t['in'])#, **t['kwargs'])
             self.assertEqual(out, t['out'])
 
+        # Vectorized comparisons on numeric and datetime columns must agree with comparing each value in Python
+        D2 = ge.dataset.PandasDataSet({
+            'f' : [0.5, 1.5, float('inf'), None],
+            'd' : pd.to_datetime(['2017-01-01', '2017-06-01', None, None]),
+        })
+        D2.set_default_expectation_argument("output_format", "COMPLETE")
+
+        T = [
+                {
+                    'in':{'column':'f', 'min_value':1},
+                    'out':{'success':False, 'exception_index_list':[0], 'exception_list':[0.5]}},
+                {
+                    'in':{'column':'f', 'min_value':0, 'max_value':2, 'mostly':.5},
+                    'out':{'success':True, 'exception_index_list':[2], 'exception_list':[float('inf')]}},
+                {
+                    'in':{'column':'f', 'min_value':'a', 'max_value':'z'},
+                    'out':{'success':False, 'exception_index_list':[0,1,2], 'exception_list':[0.5, 1.5, float('inf')]}},
+                {
+                    'in':{'column':'f'},
+                    'out':{'success':False, 'exception_index_list':[0,1,2], 'exception_list':[0.5, 1.5, float('inf')]}},
+                {
+                    'in':{'column':'d', 'min_value':'2017-03-01'},
+                    'out':{'success':False, 'exception_index_list':[0,1],
+                           'exception_list':[pd.Timestamp('2017-01-01'), pd.Timestamp('2017-06-01')]}},
+        ]
+
+        for t in T:
+            out = D2.expect_column_values_to_be_between(**t['in'])
+            self.assertEqual(out, t['out'])
+
     def test_expect_column_value_lengths_to_be_between(self):
         D = ge.dataset.PandasDataSet({
             's1':['smart','silly','sassy','slimy','sexy'],
@@ -605,6 +697,34 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_value_lengths_to_be_between(**t['in'])
             self.assertEqual(out, t['out'])
 
+        D2 = ge.dataset.PandasDataSet({
+            'cat':pd.Series(['cool','calm','collected',None,'calm']).astype('category'),
+            'mixed':['cool',5,'collected',None,['a','b']],
+        })
+        D2.set_default_expectation_argument("output_format", "COMPLETE")
+
+        T = [
+                {
+                    'in':{'column':'cat', 'min_value':4, 'max_value':6},
+                    'out':{'success':False, 'exception_index_list':[2], 'exception_list':['collected']}},
+                {
+                    'in':{'column':'mixed', 'min_value':2, 'max_value':6},
+                    'out':{'success':False, 'exception_index_list':[1,2], 'exception_list':[5,'collected']}},
+        ]
+
+        for t in T:
+            out = D2.expect_column_value_lengths_to_be_between(**t['in'])
+            self.assertEqual(out, t['out'])
+
+        # Values without a length raise when only one bound is given, as len() does
+        with self.assertRaises(TypeError):
+            D2.expect_column_value_lengths_to_be_between('mixed', max_value=6)
+
+        self.assertEqual(
+            D2.expect_column_value_lengths_to_equal('cat', 4),
+            {'success':False, 'exception_index_list':[2], 'exception_list':['collected']}
+        )
+
 
 
     def test_expect_column_values_to_match_regex(self):
@@ -712,6 +832,34 @@ class TestPandasDataset(unittest.TestCase):
     def test_expect_column_values_to_match_regex_list(self):
         self.assertRaises(NotImplementedError)
 
+        D = ge.dataset.PandasDataSet({
+            'w' : ['111', '222', '333', '123', 'bee', None],
+            'x' : [111, 222, 333, 123, 456, None],
+        })
+        D.set_default_expectation_argument("output_format", "COMPLETE")
+
+        T = [
+                {
+                    'in':{'column':'w', 'regex_list':['^1', '2+$']},
+                    'out':{'success':False, 'exception_list':['333', 'bee'], 'exception_index_list':[2,4]}},
+                {
+                    'in':{'column':'w', 'regex_list':['(\\d)\\1', 'b']},
+                    'out':{'success':False, 'exception_list':['123'], 'exception_index_list':[3]}},
+                {
+                    'in':{'column':'w', 'regex_list':['e']},
+                    'out':{'success':False, 'exception_list':['111', '222', '333', '123', 'bee'], 'exception_index_list':[0,1,2,3,4]}},
+                {
+                    'in':{'column':'w', 'regex_list':[]},
+                    'out':{'success':False, 'exception_list':['111', '222', '333', '123', 'bee'], 'exception_index_list':[0,1,2,3,4]}},
+                {
+                    'in':{'column':'x', 'regex_list':['^1', '^4']},
+                    'out':{'success':False, 'exception_list':[222, 333], 'exception_index_list':[1,2]}},
+        ]
+
+        for t in T:
+            out = D.expect_column_values_to_match_regex_list(**t['in'])
+            self.assertEqual(out, t['out'])
+
 
     def test_expect_column_values_to_match_strftime_format(self):
         """
@@ -753,6 +901,30 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_values_to_match_strftime_format(**t['in'])
             self.assertEqual(out, t['out'])
 
+        # Bulk parsing must agree with strptime, including dates pandas can't represent and ISO strings that don't
+        # follow the format exactly
+        D2 = ge.dataset.PandasDataSet({
+            'iso' : ['1977-05-25', '1977-05-25T00:00:00', '1500-05-25', '1977-5-25', '1977-02-30'],
+        })
+        D2.set_default_expectation_argument("output_format", "COMPLETE")
+
+        self.assertEqual(
+            D2.expect_column_values_to_match_strftime_format('iso', '%Y-%m-%d'),
+            {'success':False, 'exception_index_list':[1,4], 'exception_list':['1977-05-25T00:00:00', '1977-02-30']}
+        )
+
+        # Nor may it accept times that pandas parses more leniently
+        D3 = ge.dataset.PandasDataSet({
+            'ts' : ['1977-05-25 23:59:59.000001', '1977-05-25 23:59:60.000000', '1977-05-25 23:59:59.0000001'],
+        })
+        D3.set_default_expectation_argument("output_format", "COMPLETE")
+
+        self.assertEqual(
+            D3.expect_column_values_to_match_strftime_format('ts', '%Y-%m-%d %H:%M:%S.%f'),
+            {'success':False, 'exception_index_list':[1,2],
+             'exception_list':['1977-05-25 23:59:60.000000', '1977-05-25 23:59:59.0000001']}
+        )
+
     def test_expect_column_values_to_be_dateutil_parseable(self):
 
         D = ge.dataset.PandasDataSet({
@@ -785,6 +957,21 @@ class TestPandasDataset(unittest.TestCase):
             out = D.expect_column_values_to_be_dateutil_parseable(*t['in'], **t['kwargs'])
             self.assertEqual(out, t['out'])
 
+        D2 = ge.dataset.PandasDataSet({
+            'c4':['2017-01-01', '2017-02-30', 'Jared', '2017-01-01T10:00:00', 'Jared', '1500-01-01', None],
+            'c5':pd.Series(['Jared', 'June 1, 2013', 'Jared']).reindex(range(7)).astype('category'),
+        })
+        D2.set_default_expectation_argument("output_format", "COMPLETE")
+
+        self.assertEqual(
+            D2.expect_column_values_to_be_dateutil_parseable('c4'),
+            {'success':False, 'exception_list':['2017-02-30', 'Jared', 'Jared'], 'exception_index_list': [1, 2, 4]}
+        )
+        self.assertEqual(
+            D2.expect_column_values_to_be_dateutil_parseable('c5'),
+            {'success':False, 'exception_list':['Jared', 'Jared'], 'exception_index_list': [0, 2]}
+        )
+
     def test_expect_column_values_to_be_json_parseable(self):
         d1 = json.dumps({'i':[1,2,3],'j':35,'k':{'x':'five','y':5,'z':'101'}})
         d2 = json.dumps({'i':1,'j':2,'k':[3,4,5]})
@@ -1030,6 +1217,91 @@ class TestPandasDataset(unittest.TestCase):
             }
         )
 
+    def test_expectation_decorator_basic_mode_exception_count(self):
+
+        df = ge.dataset.PandasDataSet({
+            'x' : list(range(50)) + [None] * 10,
+        })
+
+        self.assertEqual(
+            df.expect_column_values_to_be_between('x', min_value=0, max_value=9, output_format="BASIC"),
+            {
+                "success" : False,
+                "summary_obj" : {
+                    "partial_exception_list" : [float(x) for x in range(10, 30)],
+                    "exception_count" : 40,
+                    "exception_percent": 40. / 60,
+                    "exception_percent_nonmissing": 0.8,
+                }
+            }
+        )
+
+        self.assertEqual(
+            df.expect_column_values_to_be_null('x', output_format="BASIC")["summary_obj"]["exception_count"],
+            50
+        )
+        self.assertEqual(
+            df.expect_column_values_to_be_between('x', min_value=0, max_value=9, mostly=0.2, output_format="BOOLEAN_ONLY"),
+            True
+        )
+
+        # Exceptions that start in a later block of the failure mask
+        df = ge.dataset.PandasDataSet({'x': [0] * 70000 + list(range(1, 101))})
+        summary_obj = df.expect_column_values_to_be_between('x', min_value=0, max_value=0, output_format="BASIC")["summary_obj"]
+        self.assertEqual(summary_obj["partial_exception_list"], list(range(1, 21)))
+        self.assertEqual(summary_obj["exception_count"], 100)
+
+    def test_column_statistics_cache(self):
+        df = ge.dataset.PandasDataSet({
+            'x': [1., 2., 3., None],
+            'y': ['a', 'b', 'a', 'c'],
+        })
+
+        # Without the cache, every expectation scans its column again, but only once
+        df.expect_column_median_to_be_between('x', 0, 10)
+        df.expect_column_median_to_be_between('x', 0, 10)
+        self.assertEqual(df.column_statistics_cache_info()['columns'], [])
+        self.assertEqual(df.column_statistics_cache_info()['misses'], 2)
+        df.expect_column_unique_value_count_to_be_between('y', 0, 10)
+        # One scan and one value count
+        self.assertEqual(df.column_statistics_cache_info()['misses'], 4)
+
+        df.enable_column_statistics_cache()
+        self.assertEqual(df.expect_column_median_to_be_between('x', 0, 10)['true_value'], 2)
+        misses = df.column_statistics_cache_info()['misses']
+        self.assertEqual(df.expect_column_median_to_be_between('x', 0, 10)['true_value'], 2)
+        self.assertEqual(df.column_statistics_cache_info()['misses'], misses)
+
+        self.assertEqual(df.expect_column_unique_value_count_to_be_between('y', 0, 10)['true_value'], 3)
+        self.assertEqual(df.expect_column_proportion_of_unique_values_to_be_between('y', 0, 1)['true_value'], 0.75)
+        self.assertEqual(sorted(df.column_statistics_cache_info()['columns']), ['x', 'y'])
+
+        # Modifications invalidate the cached scans
+        modifications = [
+            (lambda: df.__setitem__('x', [4., 5., 6., 7.]), 5.5),
+            (lambda: df.loc.__setitem__((0, 'x'), 10.), 6.5),
+            (lambda: df.at.__setitem__((1, 'x'), 11.), 8.5),
+            (lambda: df.fillna(0, inplace=True), 8.5),
+        ]
+        for modify, median in modifications:
+            modify()
+            self.assertEqual(df.expect_column_median_to_be_between('x', 0, 100)['true_value'], median)
+
+        del df['y']
+        self.assertEqual(df.column_statistics_cache_info()['columns'], ['x'])
+
+        # Validation keeps the cached scans
+        df.validate()
+        self.assertEqual(df.column_statistics_cache_info()['columns'], ['x'])
+
+        df.clear_column_statistics_cache()
+        self.assertEqual(df.column_statistics_cache_info()['columns'], [])
+
+        df.enable_column_statistics_cache(False)
+        df.expect_column_median_to_be_between('x', 0, 100)
+        self.assertFalse(df.column_statistics_cache_info()['enabled'])
+        self.assertEqual(df.column_statistics_cache_info()['columns'], [])
+
     def test_positional_arguments(self):
 
         df = ge.dataset.PandasDataSet({
@@ -4,8 +4,10 @@ import hashlib
 import datetime
 import numpy as np
 import pandas as pd
+from scipy import stats
 
 import great_expectations as ge
+from great_expectations.dataset.bootstrap import ks_test_p_values, partition_cdf
 
 
 class TestDistributionalExpectations(unittest.TestCase):
@@ -84,6 +86,28 @@ class TestDistributionalExpectations(unittest.TestCase):
             #self.assertTrue(np.allclose(out['success'], t['out']['success']))
             #self.assertTrue(np.allclose(out['true_value'], t['out']['true_value']))
 
+    def test_expect_column_chisquare_and_kl_divergence_with_other_weight(self):
+        # Folding category C into the other weight gives the same tests as listing it
+        top_k_partition = {'partition': ['A', 'B'], 'weights': [0.54, 0.32], 'other_weight': 0.14}
+        top_k_partition_alternate = {'partition': ['A', 'B'], 'weights': [1. / 3, 1. / 3], 'other_weight': 1. / 3}
+
+        for partition_object, full_partition_object in [(top_k_partition, self.categorical_partition),
+                                                        (top_k_partition_alternate, self.categorical_partition_alternate)]:
+            out = self.D.expect_column_chisquare_test_p_value_greater_than('categorical_fixed', partition_object)
+            expected = self.D.expect_column_chisquare_test_p_value_greater_than('categorical_fixed', full_partition_object)
+            self.assertEqual(out['success'], expected['success'])
+            self.assertTrue(np.allclose(out['true_value'], expected['true_value']))
+
+            out = self.D.expect_column_kl_divergence_less_than('categorical_fixed', partition_object, threshold=0.1)
+            expected = self.D.expect_column_kl_divergence_less_than('categorical_fixed', full_partition_object, threshold=0.1)
+            self.assertEqual(out['success'], expected['success'])
+            self.assertTrue(np.allclose(out['true_value'], expected['true_value']))
+
+        # Values outside the partition fail the test if the other weight is zero
+        out = self.D.expect_column_chisquare_test_p_value_greater_than(
+            'categorical_fixed', {'partition': ['A', 'B'], 'weights': [0.6, 0.4], 'other_weight': 0.})
+        self.assertFalse(out['success'])
+
     def test_expect_column_kl_divergence_less_than_discrete(self):
         T = [
                 {
@@ -175,6 +199,21 @@ class TestDistributionalExpectations(unittest.TestCase):
             out = self.D.expect_column_bootstrapped_ks_test_p_value_greater_than(*t['args'], **t['kwargs'])
             self.assertEqual(out['success'], t['out']['success'])
 
+    def test_expect_column_bootstrapped_ks_test_p_value_greater_than_random_state(self):
+        kwargs = {'partition_object': self.auto_partition_norm_0_1, 'bootstrap_samples': 250, 'random_state': 42}
+        out = self.D.expect_column_bootstrapped_ks_test_p_value_greater_than('norm_0_1', **kwargs)
+
+        # The same seed gives the same p-value, whatever the number of processes
+        self.assertEqual(out, self.D.expect_column_bootstrapped_ks_test_p_value_greater_than('norm_0_1', **kwargs))
+        self.assertEqual(out, self.D.expect_column_bootstrapped_ks_test_p_value_greater_than('norm_0_1', n_jobs=2, **kwargs))
+        self.assertEqual(out, self.D.expect_column_bootstrapped_ks_test_p_value_greater_than('norm_0_1', n_jobs=-1, **kwargs))
+
+        # The batched statistics match scipy's KS test
+        cdf_x, cdf_y = partition_cdf(self.auto_partition_norm_0_1)
+        samples = np.random.RandomState(0).choice(self.D['norm_0_1'], size=(20, 10))
+        expected = [stats.kstest(sample, lambda x: np.interp(x, cdf_x, cdf_y))[1] for sample in samples]
+        np.testing.assert_allclose(ks_test_p_values(samples, cdf_x, cdf_y), expected)
+
     def test_expect_column_kl_divergence_less_than_continuous(self):
         T = [
 # {'true_value': 0.0013326972943566281, 'success': True}
@@ -0,0 +1,177 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import great_expectations as ge
+from great_expectations.dataset.sketches import HyperLogLog, KLLSketch, MisraGries, PartitionBuilder
+from great_expectations.dataset.util import is_valid_partition_object, partition_data
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_estimate_within_error_bound(self):
+        for n in [0, 10, 1000, 200000]:
+            sketch = HyperLogLog(relative_error=0.01).update(pd.Series(np.arange(n) * 7))
+            self.assertEqual(sketch.precision, 14)
+            # Three standard errors
+            self.assertLessEqual(abs(sketch.estimate() - n), 3 * sketch.relative_error * n + 1e-9)
+
+    def test_precision_from_relative_error(self):
+        self.assertEqual(HyperLogLog(relative_error=0.5).precision, 4)
+        self.assertEqual(HyperLogLog(relative_error=0.0021).precision, 18)
+        # Precision is capped at 18, so smaller errors can't be met
+        with self.assertRaises(ValueError):
+            HyperLogLog(relative_error=0.002)
+
+    def test_merge_and_serialize(self):
+        values = pd.Series(["id_%d" % (i % 5000) for i in range(20000)])
+        single = HyperLogLog(precision=12).update(values)
+
+        merged = HyperLogLog(precision=12)
+        for chunk in np.array_split(np.arange(len(values)), 4):
+            merged.merge(HyperLogLog(precision=12).update(values.iloc[chunk]))
+        self.assertEqual(merged.estimate(), single.estimate())
+
+        restored = HyperLogLog.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(restored.estimate(), single.estimate())
+
+        with self.assertRaises(ValueError):
+            merged.merge(HyperLogLog(precision=10))
+
+        # Integral floats (integer columns upcast by nulls) hash like the integers
+        ints = HyperLogLog(precision=12).update(pd.Series([1, 2, 3]))
+        floats = HyperLogLog(precision=12).update(pd.Series([1., 2., 3.]))
+        self.assertEqual(ints.to_dict(), floats.to_dict())
+
+    def test_approximate_unique_value_expectations(self):
+        df = ge.dataset.PandasDataSet({"x": list(range(5000)) * 2})
+
+        result = df.expect_column_unique_value_count_to_be_between("x", 4900, 5100, approximate=True, output_format="SUMMARY")
+        self.assertTrue(result["success"])
+        self.assertTrue(result["summary_obj"]["approximate"])
+        lower, upper = result["summary_obj"]["confidence_interval"]
+        self.assertTrue(lower <= result["true_value"] <= upper)
+        self.assertTrue(lower <= 5000 <= upper)
+
+        result = df.expect_column_proportion_of_unique_values_to_be_between(
+            "x", 0.45, 0.55, approximate=True, relative_error=0.02, output_format="SUMMARY"
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["summary_obj"]["relative_error"], 1.04 / 64)
+
+        self.assertEqual(
+            df.expect_column_unique_value_count_to_be_between("x", 4900, 5100),
+            {"success": True, "true_value": 5000}
+        )
+
+
+class TestMisraGries(unittest.TestCase):
+
+    def test_heavy_hitters_within_error_bound(self):
+        values = pd.Series(["v%d" % value for value in np.random.RandomState(0).zipf(1.5, 100000)])
+        value_counts = values.value_counts()
+
+        merged = MisraGries(k=20)
+        for chunk in np.array_split(np.arange(len(values)), 8):
+            sketch = MisraGries(k=20).update(values.iloc[chunk])
+            merged.merge(MisraGries.from_dict(json.loads(json.dumps(sketch.to_dict()))))
+
+        self.assertEqual(merged.count, len(values))
+        self.assertLessEqual(len(merged.counts), 20)
+        # Every value with more than 1 / (k + 1) of the values is kept, and no count is over or too far under
+        for value in value_counts.index[value_counts > len(values) / 21.]:
+            self.assertIn(value, merged.counts.index)
+        errors = value_counts[merged.counts.index] - merged.counts
+        self.assertGreaterEqual(errors.min(), 0)
+        self.assertLessEqual(errors.max(), merged.error_bound())
+
+
+class TestKLLSketch(unittest.TestCase):
+
+    def test_exact_while_small(self):
+        values = pd.Series(np.random.normal(size=150))
+        sketch = KLLSketch().update(values)
+        self.assertTrue(sketch.is_exact())
+        self.assertAlmostEqual(sketch.quantile(0.5), values.median())
+        self.assertAlmostEqual(sketch.quantile(0.9), values.quantile(0.9))
+
+    def test_rank_error_bound(self):
+        np.random.seed(0)
+        values = np.random.lognormal(size=200000)
+
+        merged = KLLSketch(k=200, random_state=0)
+        for position, chunk in enumerate(np.array_split(values, 20)):
+            merged.merge(KLLSketch(k=200, random_state=position).update(chunk))
+
+        self.assertEqual(merged.count, len(values))
+        self.assertLessEqual(sum(len(items) for items in merged.compactors), 3 * 200)
+        for q in [0.1, 0.5, 0.9]:
+            self.assertLessEqual(abs(np.mean(values <= merged.quantile(q)) - q), merged.rank_error)
+
+        restored = KLLSketch.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(restored.quantile(0.5), merged.quantile(0.5))
+
+    def test_approximate_median_expectation(self):
+        df = ge.dataset.PandasDataSet({"x": np.arange(10001.)})
+        result = df.expect_column_median_to_be_between("x", 4800, 5200, approximate=True, output_format="SUMMARY")
+        self.assertTrue(result["success"])
+        self.assertLessEqual(abs(result["true_value"] - 5000), 10001 * result["summary_obj"]["rank_error"])
+
+        self.assertEqual(
+            df.expect_column_median_to_be_between("x", 4800, 5200),
+            {"success": True, "true_value": 5000}
+        )
+        self.assertFalse(df.expect_column_median_to_be_between("x", 6000, 7000)["success"])
+
+
+class TestPartitionBuilder(unittest.TestCase):
+
+    def _build(self, data, shards, **kwargs):
+        # Chunks within shards, shards merged after a round trip through json
+        builders = []
+        for shard in np.array_split(data, shards):
+            builder = PartitionBuilder(**kwargs)
+            for chunk in np.array_split(shard, 3):
+                builder.update(chunk)
+            builders.append(PartitionBuilder.from_dict(json.loads(json.dumps(builder.to_dict()))))
+
+        for builder in builders[1:]:
+            builders[0].merge(builder)
+        return builders[0].partition_object()
+
+    def test_uniform_bins_are_exact(self):
+        data = np.random.RandomState(0).lognormal(size=100000)
+        test_partition = self._build(data, 4, bins='uniform', n_bins=50, range=(data.min(), data.max()))
+        expected_partition = partition_data(data, bins='uniform', n_bins=50)
+        self.assertEqual(test_partition['weights'].tolist(), expected_partition['weights'].tolist())
+        self.assertTrue(np.allclose(test_partition['partition'], expected_partition['partition']))
+        self.assertTrue(is_valid_partition_object(test_partition))
+
+        with self.assertRaises(ValueError):
+            PartitionBuilder(bins='uniform')
+
+    def test_ntile_bins(self):
+        # Exact while the sketch holds every value
+        data = np.random.RandomState(0).randint(0, 20, size=150).astype(float)
+        test_partition = self._build(data, 1, bins='ntile', n_bins=10)
+        expected_partition = partition_data(data, bins='ntile', n_bins=10)
+        self.assertTrue(np.allclose(test_partition['partition'], expected_partition['partition']))
+        self.assertTrue(np.allclose(test_partition['weights'], expected_partition['weights']))
+
+        data = np.random.RandomState(0).lognormal(size=200000)
+        test_partition = self._build(data, 4, bins='ntile', n_bins=10)
+        self.assertTrue(is_valid_partition_object(test_partition))
+        self.assertEqual(test_partition['partition'][0], data.min())
+        self.assertEqual(test_partition['partition'][-1], data.max())
+        # Weights are within the rank error of the sketch of the actual fraction of values in each bin
+        hist = np.histogram(data, test_partition['partition'])[0] / float(len(data))
+        self.assertLess(np.max(np.abs(test_partition['weights'] - hist)), 2 * KLLSketch().rank_error)
+
+        with self.assertRaises(ValueError):
+            PartitionBuilder(bins='ntile').merge(PartitionBuilder(bins=[0, 1, 2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
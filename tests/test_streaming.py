@@ -0,0 +1,89 @@
+import json
+import unittest
+
+import pandas as pd
+
+import great_expectations as ge
+from .test_great_expectations import assertDeepAlmostEqual
+
+
+class TestStreamingValidation(unittest.TestCase):
+
+    def setUp(self):
+        with open("./tests/examples/titanic_expectations.json") as f:
+            self.config = json.load(f)
+
+        self.config["expectations"] += [
+            {"expectation_type": "expect_table_row_count_to_be_between", "kwargs": {"min_value": 0, "max_value": 2000}},
+            {"expectation_type": "expect_column_stdev_to_be_between", "kwargs": {"column": "Age", "min_value": 0, "max_value": 20}},
+            {"expectation_type": "expect_column_median_to_be_between", "kwargs": {"column": "Age", "min_value": 20, "max_value": 40}},
+            {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "Age", "mostly": 0.5}},
+            {"expectation_type": "expect_column_unique_value_count_to_be_between", "kwargs": {"column": "PClass", "min_value": 3, "max_value": 3}},
+            {"expectation_type": "expect_column_chisquare_test_p_value_greater_than", "kwargs": {
+                "column": "Sex", "partition_object": {"partition": ["male", "female"], "weights": [0.65, 0.35]}}},
+        ]
+
+    def test_validate_csv_matches_validate(self):
+        for output_format in ["BASIC", "COMPLETE", "SUMMARY"]:
+            df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config)
+            expected_results = df.validate(output_format=output_format)
+
+            results = ge.validate_csv(
+                "./tests/examples/Titanic.csv", self.config,
+                chunksize=100,
+                output_format=output_format
+            )
+            assertDeepAlmostEqual(self, expected_results, results)
+
+    def test_merge(self):
+        df = ge.read_csv("./tests/examples/Titanic.csv", expectations_config=self.config)
+        expected_results = df.validate(output_format="SUMMARY")
+
+        shards = [
+            ge.dataset.StreamingValidator(self.config, output_format="SUMMARY")
+            for k in range(2)
+        ]
+        chunks = pd.read_csv("./tests/examples/Titanic.csv", chunksize=500)
+        for k, chunk in enumerate(chunks):
+            shards[k % 2].update(chunk)
+
+        # Merging shards keeps exceptions in merge order, so compare counts rather than lists
+        shards[0].merge(shards[1])
+        results = shards[0].finalize()
+        for expected, result in zip(expected_results["results"], results["results"]):
+            self.assertEqual(expected["success"], result["success"])
+            self.assertEqual(expected.get("summary_obj", {}).get("exception_count"),
+                             result.get("summary_obj", {}).get("exception_count"))
+            if "true_value" in expected:
+                self.assertAlmostEqual(expected["true_value"], result["true_value"])
+
+    def test_unsupported_expectation(self):
+        config = {"expectations": [
+            {"expectation_type": "expect_column_bootstrapped_ks_test_p_value_greater_than", "kwargs": {
+                "column": "Age", "partition_object": {"partition": [0, 40, 80], "weights": [0.5, 0.5]}}}
+        ]}
+
+        results = ge.validate_csv("./tests/examples/Titanic.csv", config)
+        self.assertEqual(results["results"][0]["success"], False)
+        self.assertEqual(results["results"][0]["raised_exception"], True)
+
+        with self.assertRaises(NotImplementedError):
+            ge.validate_csv("./tests/examples/Titanic.csv", config, catch_exceptions=False)
+
+    def test_unique_values_across_chunks(self):
+        # Each chunk of 4 rows is unique, but every value is repeated in the other chunk
+        df = pd.DataFrame({"a": [1, 2, 3, 4, 1, 2, 3, 4]})
+        config = {"expectations": [{"expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "a"}}]}
+
+        self.assertFalse(ge.df(df.copy(), config).validate()["results"][0]["success"])
+
+        validator = ge.dataset.StreamingValidator(config)
+        validator.update(df.iloc[:4].copy())
+        validator.update(df.iloc[4:].copy())
+        result = validator.finalize()["results"][0]
+        self.assertEqual(result["success"], False)
+        self.assertEqual(result["raised_exception"], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -93,6 +93,20 @@ class TestUtilMethods(unittest.TestCase):
                 # NOTE ARBITRARY "CLOSE PARAMETER"
                 self.assertLess(abs(val[k] - test_partition[key][k]), 1e-8)
 
+    def test_kde_smooth_data_approximate(self):
+        data = np.random.RandomState(0).normal(size=10000)
+        exact_partition = ge.dataset.util.kde_smooth_data(data)
+        test_partition = ge.dataset.util.kde_smooth_data(data, approximate=True)
+        self.assertEqual(test_partition['partition'], exact_partition['partition'])
+        self.assertTrue(np.allclose(test_partition['weights'], exact_partition['weights'], rtol=0, atol=1e-5))
+        self.assertTrue(ge.dataset.util.is_valid_partition_object(test_partition))
+
+        # Fitting to a sample is reproducible with a seed
+        test_partition = ge.dataset.util.kde_smooth_data(data, max_samples=1000, random_state=0)
+        self.assertEqual(test_partition, ge.dataset.util.kde_smooth_data(data, max_samples=1000, random_state=0))
+        # The bandwidth, and so the bin width, of an estimate fit to fewer values is larger
+        self.assertLess(len(test_partition['weights']), len(exact_partition['weights']))
+
     def test_categorical_data_fixed(self):
         test_partition = ge.dataset.util.categorical_partition_data(self.D.categorical_fixed)
         test_partition['partition'] = test_partition['partition'].tolist()
@@ -101,6 +115,21 @@ class TestUtilMethods(unittest.TestCase):
                 self.categorical_partition['weights'][self.categorical_partition['partition'].index(k)],
                 test_partition['weights'][test_partition['partition'].index(k)])
 
+    def test_categorical_data_top_k(self):
+        for approximate in [False, True]:
+            test_partition = ge.dataset.util.categorical_partition_data(self.D.categorical_fixed, top_k=2, approximate=approximate)
+            self.assertEqual(test_partition['partition'].tolist(), ['A', 'B'])
+            self.assertTrue(ge.dataset.util.is_valid_partition_object(test_partition))
+
+        test_partition = ge.dataset.util.categorical_partition_data(self.D.categorical_fixed, top_k=2)
+        self.assertTrue(np.allclose(test_partition['weights'], [0.54, 0.32]))
+        self.assertAlmostEqual(test_partition['other_weight'], 0.14)
+
+    def test_is_valid_partition_object_other_weight(self):
+        self.assertTrue(ge.dataset.util.is_valid_partition_object({'partition': ['a', 'b'], 'weights': [0.5, 0.3], 'other_weight': 0.2}))
+        self.assertFalse(ge.dataset.util.is_valid_partition_object({'partition': ['a', 'b'], 'weights': [0.5, 0.3], 'other_weight': 0.3}))
+        self.assertFalse(ge.dataset.util.is_valid_partition_object({'partition': [0, 1, 2], 'weights': [0.5, 0.3], 'other_weight': 0.2}))
+
     def test_is_valid_partition_object_simple(self):
         self.assertTrue(ge.dataset.util.is_valid_partition_object(self.kde_smooth_partition_bimodal))
         self.assertTrue(ge.dataset.util.is_valid_partition_object(self.auto_partition_bimodal))
@@ -117,6 +146,34 @@ class TestUtilMethods(unittest.TestCase):
         self.assertFalse(ge.dataset.util.is_valid_partition_object({'weights': [0.5,0.5]}))
         self.assertFalse(ge.dataset.util.is_valid_partition_object({'partition': [0,1,2]}))
 
+    def test_remove_empty_intervals(self):
+        # A run of empty intervals moves the right endpoint to the middle of each in turn
+        test_partition = ge.dataset.util.remove_empty_intervals({'partition': [0., 1., 2., 3., 4., 5.], 'weights': [0.5, 0, 0, 0.25, 0.25]})
+        self.assertEqual(test_partition['partition'].tolist(), [0, 2.25, 4, 5])
+        self.assertEqual(test_partition['weights'].tolist(), [0.5, 0.25, 0.25])
+
+        # An empty last interval is dropped with its left endpoint
+        test_partition = ge.dataset.util.remove_empty_intervals({'partition': [0., 1., 2., 3.], 'weights': [0.5, 0.5, 0]})
+        self.assertEqual(test_partition['partition'].tolist(), [0, 1, 3])
+        self.assertEqual(test_partition['weights'].tolist(), [0.5, 0.5])
+
+    def test_remove_empty_intervals_many_bins(self):
+        # Sparse histograms with many bins are handled in one pass
+        weights = np.zeros(20000)
+        weights[::7] = 1. / len(weights[::7])
+        test_partition = ge.dataset.util.remove_empty_intervals({'partition': np.linspace(0, 1, 20001), 'weights': weights})
+        self.assertEqual(len(test_partition['weights']), 2858)
+        self.assertEqual(len(test_partition['partition']), 2859)
+        self.assertTrue(np.all(np.diff(test_partition['partition']) > 0))
+        self.assertTrue(ge.dataset.util.is_valid_partition_object(test_partition))
+
+    def test_partition_data_uniform(self):
+        data = np.random.RandomState(0).normal(size=10000)
+        test_partition = ge.dataset.util.partition_data(data, bins='uniform', n_bins=10000)
+        bin_edges = np.linspace(np.min(data), np.max(data), 10001)
+        self.assertTrue(np.allclose(test_partition['partition'], bin_edges))
+        self.assertEqual(test_partition['weights'].tolist(), (np.histogram(data, bin_edges)[0] / 10000.).tolist())
+
     def test_ensure_json_serializable(self):
         # TODO: Make a meaningful test
         self.assertEqual(1,1)